@@ -3,29 +3,99 @@ Response Formatter, Reformatter, and Query Refiner
 Uses Google Gemini (google-genai SDK, new API)
 """
 
+import asyncio
 import logging
-from typing import Optional
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Hashable, Optional
 
-from google import genai
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Rough character budget for text sent to a rewrite prompt. Beyond this
+# the 1–2k output-token limits truncate the rewrite, so the call is skipped.
+MAX_REWRITE_INPUT_CHARS = 8000
+
 # ------------------------------------------------------------------
 # Gemini Client Singleton
 # ------------------------------------------------------------------
 
-_gemini_client = None
+@lru_cache(maxsize=None)
+def _get_client(api_key: str):
+    # The SDK pulls in httpx, pydantic models and auth libraries; only pay
+    # for that import once a Gemini-backed service is actually created.
+    from google import genai
+
+    client = genai.Client(api_key=api_key)
+    logger.info("Gemini client initialized")
+    return client
+
+
+def get_gemini_client(api_key: str | None = None):
+    """Shared Gemini client, created once per API key"""
+    api_key = api_key or settings.GEMINI_API_KEY
+    if not api_key:
+        raise RuntimeError("GEMINI_API_KEY is not set")
+    return _get_client(api_key)
+
+
+async def _generate(client, prompt: str, config: Dict) -> str:
+    response = await client.aio.models.generate_content(
+        model="gemini-2.0-flash",
+        contents=prompt,
+        config=config,
+    )
+    return response.text.strip()
+
+
+# ------------------------------------------------------------------
+# Call De-duplication
+# ------------------------------------------------------------------
+
+class _CallCache:
+    """
+    Shares a single Gemini call between identical concurrent requests and
+    keeps a bounded LRU of completed results.
+
+    All bookkeeping happens on the event loop between awaits, so no lock
+    is needed around the in-flight map.
+    """
 
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._results: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
 
-def get_gemini_client():
-    global _gemini_client
-    if _gemini_client is None:
-        if not settings.GEMINI_API_KEY:
-            raise RuntimeError("GEMINI_API_KEY is not set")
-        _gemini_client = genai.Client(api_key=settings.GEMINI_API_KEY)
-        logger.info("Gemini client initialized")
-    return _gemini_client
+    async def get_or_call(
+        self,
+        key: Hashable,
+        call: Callable[[], Awaitable[str]],
+    ) -> str:
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            # The call runs as its own task, so a caller that is cancelled
+            # only stops waiting; the others still get the result
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:  # also marks it retrieved
+            return
+        if self.maxsize:
+            self._results[key] = task.result()
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
 
 
 # ------------------------------------------------------------------
@@ -33,9 +103,10 @@ def get_gemini_client():
 # ------------------------------------------------------------------
 
 class ResponseFormatter:
-    def __init__(self):
-        self.client = get_gemini_client()
-        self.model = self.client.models.get("gemini-2.0-flash")
+    def __init__(self, client=None):
+        self.client = client or get_gemini_client()
+        self._gen_config = {"temperature": 0.1, "max_output_tokens": 2048}
+        self._calls = _CallCache()
         self.available = True
         logger.info("ResponseFormatter ready")
 
@@ -45,6 +116,10 @@ class ResponseFormatter:
         user_query: str,
         context_verses: str
     ) -> str:
+        if len(original_response) + len(context_verses) > MAX_REWRITE_INPUT_CHARS:
+            logger.info("Formatter input too large, returning response unchanged")
+            return original_response
+
         prompt = f"""
 You are a wise Bhagavad Gita teacher.
 
@@ -72,8 +147,10 @@ Rules:
 """
 
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return await self._calls.get_or_call(
+                prompt,
+                lambda: _generate(self.client, prompt, self._gen_config),
+            )
         except Exception:
             logger.exception("Gemini formatter failed")
             raise RuntimeError("LLM formatter unavailable")
@@ -84,24 +161,26 @@ Rules:
 # ------------------------------------------------------------------
 
 class ResponseReformatter:
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, client=None):
         self.available = False
-        self.client = None
-
-        if not api_key:
-            logger.warning("ResponseReformatter disabled (no GEMINI_API_KEY)")
-            return
-
-        try:
-            from google import genai
+        self.client = client
+        self._gen_config = {"temperature": 0.7, "max_output_tokens": 1024}
+        # Sampling at 0.7 is not repeatable, so only share in-flight calls
+        self._calls = _CallCache(maxsize=0)
+
+        if self.client is None:
+            if not api_key:
+                logger.warning("ResponseReformatter disabled (no GEMINI_API_KEY)")
+                return
+
+            try:
+                self.client = get_gemini_client(api_key)
+            except Exception as e:
+                logger.error(f"❌ ResponseReformatter init failed: {e}")
+                return
 
-            self.client = genai.Client(api_key=api_key)
-            self.available = True
-            logger.info("✅ ResponseReformatter ready with Gemini")
-
-        except Exception as e:
-            self.available = False
-            logger.error(f"❌ ResponseReformatter init failed: {e}")
+        self.available = True
+        logger.info("✅ ResponseReformatter ready with Gemini")
 
     async def reformulate_response(
         self,
@@ -112,6 +191,10 @@ class ResponseReformatter:
         if not self.available:
             return original_response
 
+        if len(original_response) + len(context_verses) > MAX_REWRITE_INPUT_CHARS:
+            logger.info("Reformatter input too large, returning response unchanged")
+            return original_response
+
         prompt = f"""
 You are a compassionate Sanatan Dharma guide.
 
@@ -130,15 +213,18 @@ Rewrite the response to be:
 - grounded in Sanatan wisdom
 - calm and reassuring
 
+Layout:
+- Plain text, no markdown
+- Short paragraphs of 2–3 sentences, separated by a blank line
+
 Do not repeat verses verbatim unless necessary.
 """
 
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
+            return await self._calls.get_or_call(
+                prompt,
+                lambda: _generate(self.client, prompt, self._gen_config),
             )
-            return response.text.strip()
         except Exception:
             return original_response
 
@@ -148,28 +234,25 @@ Do not repeat verses verbatim unless necessary.
 # ------------------------------------------------------------------
 
 class QueryRefiner:
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, client=None):
         self.available = False
-        self.client = None
-        self.model = None
+        self.client = client
+        self._gen_config = {"temperature": 0.3, "max_output_tokens": 50}
+        self._calls = _CallCache(maxsize=1024)
 
-        if not api_key:
-            logger.warning("QueryRefiner disabled (no GEMINI_API_KEY)")
-            return
-
-        try:
-            from google import genai
+        if self.client is None:
+            if not api_key:
+                logger.warning("QueryRefiner disabled (no GEMINI_API_KEY)")
+                return
 
-            self.client = genai.Client(api_key=api_key)
-            self.model = self.client.models.get(
-                model="gemini-2.0-flash"
-            )
-            self.available = True
-            logger.info("✅ QueryRefiner ready with Gemini")
+            try:
+                self.client = get_gemini_client(api_key)
+            except Exception as e:
+                logger.error(f"❌ QueryRefiner init failed: {e}")
+                return
 
-        except Exception as e:
-            self.available = False
-            logger.error(f"❌ QueryRefiner init failed: {e}")
+        self.available = True
+        logger.info("✅ QueryRefiner ready with Gemini")
 
     async def refine_query(self, query: str, language: str = "en") -> str:
         if not self.available or len(query.split()) < 3:
@@ -186,40 +269,61 @@ Return only 3–6 keyword phrase.
 """
 
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
+            return await self._calls.get_or_call(
+                (language, query.strip().lower()),
+                lambda: _generate(self.client, prompt, self._gen_config),
             )
-            return response.text.strip()
         except Exception:
             return query
 
 
 # ------------------------------------------------------------------
-# Singletons
+# Shared Services
 # ------------------------------------------------------------------
 
-_formatter: Optional[ResponseFormatter] = None
-_reformatter: Optional[ResponseReformatter] = None
-_refiner: Optional[QueryRefiner] = None
+class GeminiServices:
+    """Formatter, reformatter and refiner sharing one Gemini client"""
+
+    def __init__(self, api_key: str | None = None):
+        self.client = None
+        if api_key:
+            try:
+                self.client = get_gemini_client(api_key)
+            except Exception as e:
+                logger.error(f"❌ Gemini client init failed: {e}")
+
+        self.formatter: Optional[ResponseFormatter] = (
+            ResponseFormatter(client=self.client) if self.client else None
+        )
+        self.reformatter = ResponseReformatter(client=self.client)
+        self.refiner = QueryRefiner(client=self.client)
+
+
+_gemini_services: Dict[Optional[str], GeminiServices] = {}
+_gemini_services_lock = threading.Lock()
+
+def get_gemini_services(api_key: str | None = None) -> GeminiServices:
+    # Refiner and reformatter are initialized concurrently at startup; the
+    # lock keeps them on one GeminiServices instead of building two
+    services = _gemini_services.get(api_key)
+    if services is None:
+        with _gemini_services_lock:
+            services = _gemini_services.get(api_key)
+            if services is None:
+                services = _gemini_services[api_key] = GeminiServices(api_key)
+    return services
 
 
 def get_formatter() -> ResponseFormatter:
-    global _formatter
-    if _formatter is None:
-        _formatter = ResponseFormatter()
-    return _formatter
+    formatter = get_gemini_services(settings.GEMINI_API_KEY).formatter
+    if formatter is None:
+        raise RuntimeError("GEMINI_API_KEY is not set")
+    return formatter
 
 
 def get_reformatter(api_key: str | None = None) -> ResponseReformatter:
-    global _reformatter
-    if _reformatter is None:
-        _reformatter = ResponseReformatter(api_key)
-    return _reformatter
+    return get_gemini_services(api_key).reformatter
 
 
 def get_refiner(api_key: str | None = None) -> QueryRefiner:
-    global _refiner
-    if _refiner is None:
-        _refiner = QueryRefiner(api_key)
-    return _refiner
+    return get_gemini_services(api_key).refiner
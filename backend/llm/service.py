@@ -3,11 +3,18 @@ LLM Service - Spiritual Companion with Context-Aware Responses
 Provides empathetic, phase-aware interactions using Gemini AI
 """
 
+import hashlib
+import itertools
 import logging
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass, field
-from enum import Enum
+import random
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Optional, Any, Tuple
+from enum import IntFlag
 from config import settings
+from llm.formatter import get_gemini_client
 
 logger = logging.getLogger(__name__)
 
@@ -19,21 +26,248 @@ logger = logging.getLogger(__name__)
 from models.session import ConversationPhase
 
 
-@dataclass
-class UserContext:
-    """User's conversation context and signals"""
-    family_support: bool = False
-    support_quality: bool = False
-    relationship_crisis: bool = False
-    work_stress: bool = False
-    spiritual_seeking: bool = False
-    
+class UserContext(IntFlag):
+    """User's conversation context and signals, one bit per signal"""
+    NONE = 0
+    FAMILY_SUPPORT = 1
+    SUPPORT_QUALITY = 2
+    RELATIONSHIP_CRISIS = 4
+    WORK_STRESS = 8
+    SPIRITUAL_SEEKING = 16
+
     def is_ready_for_guidance(self) -> bool:
         """Check if enough context gathered for guidance"""
         # Transition if we've identified a life area OR spiritual seeking
         # OR if we've identified a relationship/work crisis
-        return (self.spiritual_seeking or self.work_stress or 
-                self.relationship_crisis or self.family_support)
+        return bool(self & GUIDANCE_READY_SIGNALS)
+
+
+GUIDANCE_READY_SIGNALS = (
+    UserContext.SPIRITUAL_SEEKING
+    | UserContext.WORK_STRESS
+    | UserContext.RELATIONSHIP_CRISIS
+    | UserContext.FAMILY_SUPPORT
+)
+
+
+# --------------------------------------------------
+# Context Keywords
+# --------------------------------------------------
+
+# Keywords in the current message, grouped by the UserContext flag they set
+QUERY_CONTEXT_KEYWORDS = {
+    UserContext.RELATIONSHIP_CRISIS: [
+        "wife", "wives", "husband", "husbands", "divorce", "divorced",
+        "divorcing", "marriage", "marriages", "partner", "partners",
+    ],
+    UserContext.FAMILY_SUPPORT: [
+        "family", "families", "mother", "mothers", "father", "fathers",
+        "parents", "grandparents", "children", "grandchildren",
+    ],
+    UserContext.SUPPORT_QUALITY: [
+        "listen", "listens", "listened", "listening", "support", "supports",
+        "supported", "supporting", "supportive", "understand", "understands",
+        "understanding", "care", "cares", "cared", "help", "helps", "helped",
+        "helping", "helpful",
+    ],
+    UserContext.WORK_STRESS: [
+        "work", "works", "worked", "working", "workplace", "workload",
+        "overworked", "job", "jobs", "boss", "bosses", "career", "careers",
+        "office", "offices", "deadline", "deadlines",
+    ],
+    # Spiritual seeking / Struggle / Happiness signals
+    UserContext.SPIRITUAL_SEEKING: [
+        "peace", "peaceful", "purpose", "meaning", "meaningful",
+        "meaningless", "dharma", "karma", "meditation", "meditate",
+        "meditating", "sad", "sadly", "sadness", "struggle", "struggles",
+        "struggled", "struggling", "lost", "confused", "happy", "unhappy",
+        "happiness", "unhappiness", "joy", "joyful", "joyless",
+    ],
+}
+
+# Narrower set re-checked in the user's earlier messages
+HISTORY_CONTEXT_KEYWORDS = {
+    UserContext.FAMILY_SUPPORT: ["family", "families"],
+    UserContext.SUPPORT_QUALITY: [
+        "listen", "listens", "listened", "listening", "support", "supports",
+        "supported", "supporting", "supportive", "understand", "understands",
+        "understanding",
+    ],
+    UserContext.RELATIONSHIP_CRISIS: [
+        "divorce", "divorced", "divorcing", "separation", "separations",
+        "breakup", "breakups",
+    ],
+}
+
+
+def _compile_keywords(groups: Dict[UserContext, List[str]]) -> Dict[str, UserContext]:
+    """Build a keyword -> combined flags lookup"""
+    flags: Dict[str, UserContext] = {}
+    for flag, words in groups.items():
+        for word in words:
+            flags[word] = flags.get(word, UserContext.NONE) | flag
+    return flags
+
+
+_QUERY_KEYWORD_FLAGS = _compile_keywords(QUERY_CONTEXT_KEYWORDS)
+_HISTORY_KEYWORD_FLAGS = _compile_keywords(HISTORY_CONTEXT_KEYWORDS)
+
+# Whole words only, so "care" no longer fires inside "career" or "carer";
+# the keyword lists spell out the inflected forms substring matching caught
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _scan_keywords(text: str, keyword_flags: Dict[str, UserContext]) -> UserContext:
+    """OR together the flags of every keyword among the words of text"""
+    context = UserContext.NONE
+    for word in keyword_flags.keys() & set(_WORD_RE.findall(text)):
+        context |= keyword_flags[word]
+    return context
+
+
+# --------------------------------------------------
+# Prompt Templates
+# --------------------------------------------------
+
+RULE_LINE = "═" * 59
+PROFILE_RULE = "=" * 70
+PROFILE_HEADER = f"\n{PROFILE_RULE}\nWHO YOU ARE SPEAKING TO:\n{PROFILE_RULE}\n"
+
+# History sent with each prompt: the newest messages verbatim, the rest of
+# the window condensed so prompt size stays flat as the session grows
+PROMPT_HISTORY_MESSAGES = 12
+VERBATIM_HISTORY_MESSAGES = 6
+CONDENSED_MESSAGE_CHARS = 160
+_FIRST_SENTENCE_RE = re.compile(r".+?[.!?](?=\s|$)", re.DOTALL)
+
+# user_profile key -> label in the "WHO YOU ARE SPEAKING TO" block, in order
+PROFILE_FIELDS = (
+    ("name", "Their name is"),
+    ("age_group", "Age group"),
+    ("dob", "Date of birth"),
+    ("profession", "Profession"),
+    ("gender", "Gender"),
+    ("phone", "Phone"),
+    # Add context for conversation
+    ("primary_concern", "What they've shared"),
+    ("emotional_state", "Current emotion"),
+    ("life_area", "Life area"),
+)
+
+# A verse meaning this similar to its text adds tokens but no information
+MEANING_DUPLICATE_SIMILARITY = 0.8
+
+VERSE_SEPARATOR = "\n" + "-" * 60 + "\n\n"
+
+SCRIPTURE_HEADER = (
+    f"\n{RULE_LINE}\n"
+    "VERSES AVAILABLE (Use ONLY if they naturally fit the conversation):\n"
+    f"{RULE_LINE}\n\n"
+)
+
+SCRIPTURE_USAGE_GUIDE = """
+HOW TO USE THESE VERSES:
+- **OPTIONAL**: You are NOT required to use these in every response.
+- **USE ONLY IF**: The verse truly offers a solution or comfort to the *specific* thing the user just said.
+- **IF YOU USE IT**:
+  - Cite it clearly (e.g., Bhagavad Gita 2.47).
+  - Explain it simply.
+  - Connect it to their life ("I feel this Says to you that...").
+- Keep it heartfelt and meaningful.
+"""
+
+LISTENING_INSTRUCTIONS = """
+LISTENING PHASE:
+Your priority is to understand. However, you ARE a spiritual companion.
+
+1. DEEP LISTENING (ESSENTIAL):
+- Acknowledge facts and feelings using your own words (No-Parrot Rule).
+- NEVER ask a question they have already answered.
+
+2. GENTLE WISDOM (OPTIONAL):
+- Do NOT bring in a verse just to fill space.
+- Only share a verse if it deeply resonates with what they just confessed.
+- If you shared a verse recently, focus this turn on pure human empathy and understanding.
+
+3. STYLE:
+- 80% Empathy, 20% Wisdom.
+- "I hear you..." -> "It must be hard..." -> "It reminds me of..." (Wisdom comes last, if at all).
+"""
+
+GUIDANCE_INSTRUCTIONS = """
+GUIDANCE PHASE:
+You have understood their situation. Now, be a wise friend leading them toward light.
+
+1. PROACTIVE WISDOM:
+- Share a relevant verse as a central part of your guidance.
+- Weave the wisdom into your response early so the user feels the depth of the tradition.
+
+2. HOW TO SHARE:
+- ALWAYS PROVIDE: Citation (Source/Verse), Simple Explanation, and specific Relevance to their story.
+- Respond to their progress and feelings first, then weave in the wisdom.
+"""
+
+CLOSURE_INSTRUCTIONS = """
+CLOSURE PHASE:
+- Reassure them they've been heard
+- No pressure, no questions
+- Hold space for silence
+- Offer gentle closing words
+"""
+
+# Closure turns follow CLOSURE_INSTRUCTIONS closely enough to be pre-authored,
+# which saves a Gemini round trip on every goodbye
+CLOSURE_TEMPLATES = [
+    "Thank you for sharing this with me{name}. You've been heard, and I'm here whenever you want to talk again.",
+    "I'm glad we could sit with this together{name}. Take gentle care of yourself; I'm always here.",
+    "There's no rush and nothing more you need to say{name}. Go gently, and come back whenever you wish.",
+    "Thank you for your trust{name}. May you find peace in the quiet moments ahead. 🙏",
+]
+
+# Sent with the system instruction rather than repeated in every prompt
+PROMPT_RULES = """
+CRITICAL RULES:
+1. READ THE CONVERSATION FLOW - identify which questions you've already asked.
+2. REVIEW THE FACTS - don't ask for things already listed in "WHAT YOU KNOW SO FAR".
+3. Acknowledge what they just said before asking anything new.
+4. NO-FORMULA RULE: Do not start with "So it sounds like" or "I hear you". Jump straight into a human response.
+5. FRESH WISDOM: Check the "CONVERSATION FLOW". If you already shared a specific verse, NEVER repeat it.
+6. If they didn't ask a question, you don't always need to give a verse. Just stay in the chat.
+7. Keep it conversational, empathetic, and human (around 100-150 words if sharing a verse).
+"""
+
+# Returned when Gemini errors out or sends back no usable text, in turn
+FALLBACK_RESPONSES = (
+    "I'm here with you. You don't have to carry this alone.",
+    "I hear you. Take a deep breath; I'm here to listen.",
+    "I'm with you. Please tell me more about what's on your mind.",
+    "I'm listening. You're not alone in this."
+)
+_fallback_cycle = itertools.cycle(FALLBACK_RESPONSES)
+
+
+def fallback_response() -> str:
+    """Next of the FALLBACK_RESPONSES, for turns that got no usable reply"""
+    return next(_fallback_cycle)
+
+# The full phase and verse guidance is sent once with the system
+# instruction; each prompt only names the phase that applies
+PHASE_GUIDE = (
+    "\nPHASE GUIDANCE (each message tells you which phase to follow):\n"
+    + LISTENING_INSTRUCTIONS
+    + GUIDANCE_INSTRUCTIONS
+    + CLOSURE_INSTRUCTIONS
+    + "\nWhen a message lists VERSES AVAILABLE:"
+    + SCRIPTURE_USAGE_GUIDE
+)
+
+CLOSURE_PHASE_INSTRUCTION = "Follow the CLOSURE PHASE guidance."
+
+# Any other phase (e.g. CLARIFICATION) falls back to the closure wording
+PHASE_INSTRUCTIONS = {
+    ConversationPhase.LISTENING: "Follow the LISTENING PHASE guidance.",
+    ConversationPhase.GUIDANCE: "Follow the GUIDANCE PHASE guidance.",
+}
 
 
 # --------------------------------------------------
@@ -53,32 +287,169 @@ def clean_response(text: str) -> str:
     # return "\n".join(lines).strip()
 
 
+_CLOSURE_PHRASES = r"(?:ok|okay|thanks|thank you|got it|fine|alright|i understand)"
+
+# The whole message must be closure phrases ("ok thanks!", "Got it."), so
+# "I'm not fine" or "thanks, but my boss..." keep the conversation going
+_CLOSURE_RE = re.compile(
+    rf"^\W*{_CLOSURE_PHRASES}(?:\W+{_CLOSURE_PHRASES})*\W*$",
+    re.IGNORECASE,
+)
+
+
+# Longer messages carry real content, so they skip the regex entirely
+CLOSURE_MAX_CHARS = 40
+
+
 def is_closure_signal(text: str) -> bool:
     """Detect if user is wrapping up conversation"""
-    closure_phrases = [
-        "ok", "okay", "thanks", "thank you", 
-        "got it", "fine", "alright", "i understand"
-    ]
-    text_lower = text.strip().lower()
-    return any(phrase in text_lower for phrase in closure_phrases)
+    if len(text) > CLOSURE_MAX_CHARS:
+        return False
+    return _match_closure(text)
 
 
-# --------------------------------------------------
-# Gemini Integration
-# --------------------------------------------------
+# Short acknowledgements repeat constantly across users, so the few
+# distinct strings that reach the regex are worth remembering
+@lru_cache(maxsize=1024)
+def _match_closure(text: str) -> bool:
+    return _CLOSURE_RE.match(text) is not None
+
+
+def _condense(text: str) -> str:
+    """Shorten an older history message to its first sentence"""
+    match = _FIRST_SENTENCE_RE.match(text.strip())
+    sentence = match.group() if match else text.strip()
+    if len(sentence) > CONDENSED_MESSAGE_CHARS:
+        sentence = sentence[:CONDENSED_MESSAGE_CHARS].rstrip() + "…"
+    elif len(sentence) < len(text.strip()):
+        sentence += " …"
+    return sentence
+
+
+def _trigrams(text: str) -> set:
+    text = " ".join(text.lower().split())
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _near_duplicate(a: str, b: str) -> bool:
+    """Trigram Jaccard similarity above MEANING_DUPLICATE_SIMILARITY"""
+    ta, tb = _trigrams(a), _trigrams(b)
+    if not ta or not tb:
+        return False
+    return len(ta & tb) / len(ta | tb) > MEANING_DUPLICATE_SIMILARITY
+
+
+def _select_verses(
+    docs: List[Dict], limit: int = 3
+) -> Tuple[Tuple[str, str, str, str], ...]:
+    """
+    Pick the first `limit` distinct verses as (scripture, reference, text,
+    meaning). RAG often returns the same verse from overlapping chunks, and
+    a meaning that just restates the text is dropped.
+    """
+    seen = set()
+    verses = []
+    for doc in docs:
+        scripture = doc.get('scripture', 'Scripture')
+        reference = doc.get('reference', '')
+        text = doc.get('text', '')
+        key = (scripture, reference or text)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        meaning = doc.get('meaning', '')
+        if meaning and _near_duplicate(text, meaning):
+            meaning = ''
+        verses.append((scripture, reference, text, meaning))
+        if len(verses) == limit:
+            break
+    return tuple(verses)
+
+
+def _prompt_key(prompt: str) -> bytes:
+    """Compact digest of the exact prompt sent to Gemini"""
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+
+
+def _render_prompt(
+    query: str,
+    recent_history: Tuple[Tuple[str, str], ...],
+    phase: ConversationPhase,
+    context_summary: str,
+    verses: Tuple[Tuple[str, str, str, str], ...],
+    profile_items: Tuple[Tuple[str, str], ...],
+) -> str:
+    """Assemble the Gemini prompt from already-extracted pieces"""
+    profile_text = ""
+    if profile_items:
+        profile_text = (
+            PROFILE_HEADER
+            + "\n".join(f"   • {label}: {value}" for label, value in profile_items)
+            + f"\n{PROFILE_RULE}\n\n"
+        )
+
+    history_text = "".join(
+        f"{'User' if role == 'user' else 'You'}: {content}\n"
+        for role, content in recent_history
+    )
+
+    # Phase-specific instructions
+    phase_instructions = PHASE_INSTRUCTIONS.get(phase, CLOSURE_PHASE_INSTRUCTION)
+
+    # Allow verses in both phases so the bot can choose the right moment
+    scripture_context = ""
+    if verses:
+        parts = [SCRIPTURE_HEADER]
+        for i, (scripture, reference, text, meaning) in enumerate(verses, 1):
+            parts.append(f"VERSE {i}:\nSource: {scripture}")
+            if reference:
+                parts.append(f" - {reference}")
+            parts.append(f"\n\nText: \"{text}\"\n")
+            if meaning:
+                parts.append(f"Meaning: {meaning}\n")
+            parts.append(VERSE_SEPARATOR)
+        scripture_context = "".join(parts)
+
+    # Stable sections first (profile, then the append-only history) so
+    # consecutive turns share the longest possible prompt prefix; everything
+    # that changes from turn to turn comes after the current message. The
+    # fixed rules and phase guidance live in the cached system instruction.
+    prompt = f"""
+{profile_text}
+
+═══════════════════════════════════════════════════════════
+CONVERSATION FLOW:
+═══════════════════════════════════════════════════════════
+{history_text}
+
+User's CURRENT message:
+{query}
 
-try:
-    from google import genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    genai = None
-    GEMINI_AVAILABLE = False
+═══════════════════════════════════════════════════════════
+WHAT YOU KNOW SO FAR (FACTS):
+═══════════════════════════════════════════════════════════
+{context_summary}
+
+═══════════════════════════════════════════════════════════
+YOUR INSTRUCTIONS FOR THIS PHASE ({phase.value}):
+═══════════════════════════════════════════════════════════
+{phase_instructions}
+
+{scripture_context}
+
+Your response:
+"""
+    return prompt.strip()
 
 
 # --------------------------------------------------
 # Main LLM Service
 # --------------------------------------------------
 
+GEMINI_MODEL = "gemini-2.0-flash"
+
+
 class LLMService:
     """
     Spiritual companion LLM service using Google Gemini.
@@ -111,30 +482,35 @@ When you DO share a verse:
 - **Keep it Relevant**: It must directly address the specific emotion they just mentioned.
 - **Keep it Simple**: 1) Source/Verse, 2) Very simple meaning, 3) How it helps THEM right now.
 - **Focus on One**: Don't overwhelm. One good verse is better than two average ones.
-"""
+""" + PROMPT_RULES + PHASE_GUIDE
+
 
+    # Most recent messages scanned for context signals
+    CONTEXT_HISTORY_WINDOW = 32
+    # Distinct prompts whose cleaned responses are reused
+    RESPONSE_CACHE_SIZE = 512
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.GEMINI_API_KEY
         self.available = False
         self.client = None
-
-        if not GEMINI_AVAILABLE:
-            logger.warning("Gemini SDK not available")
-            return
+        # blake2b(prompt) -> cleaned response text
+        self._resp_cache: "OrderedDict[bytes, str]" = OrderedDict()
 
         if not self.api_key:
             logger.warning("Gemini API key not provided")
             return
 
+        # google.genai is imported on first client creation, not when this
+        # module loads, and the client is shared with the formatter services
         try:
-            from google import genai
-
-            self.client = genai.Client(api_key=self.api_key)
+            self.client = get_gemini_client(self.api_key)
             self.available = True
             logger.info("✅ LLM Service initialized with Gemini")
 
-        except Exception as e:
+        except ImportError:
+            logger.warning("Gemini SDK not available")
+        except Exception:
             self.available = False
             logger.exception("❌ Failed to initialize Gemini")
 
@@ -148,47 +524,26 @@ When you DO share a verse:
         conversation_history: Optional[List[Dict]] = None
     ) -> UserContext:
         """Extract user context from query and conversation history"""
-        context = UserContext()
+        context = self._scan_history(conversation_history)
         
         # Analyze current query
-        query_lower = query.lower()
-        
-        # Relationship signals
-        if any(word in query_lower for word in ["wife", "husband", "divorce", "marriage", "partner"]):
-            context.relationship_crisis = True
-        
-        # Family signals
-        if any(word in query_lower for word in ["family", "mother", "father", "parents", "children"]):
-            context.family_support = True
-        
-        # Support quality signals
-        if any(word in query_lower for word in ["listen", "support", "understand", "care", "help"]):
-            context.support_quality = True
-        
-        # Work stress signals
-        if any(word in query_lower for word in ["work", "job", "boss", "career", "office", "deadline"]):
-            context.work_stress = True
-        
-        # Spiritual seeking / Struggle / Happiness signals
-        if any(word in query_lower for word in ["peace", "purpose", "meaning", "dharma", "karma", "meditation", "sad", "sadness", "struggle", "lost", "confused", "happy", "happiness", "joy"]):
-            context.spiritual_seeking = True
-        
-        # Analyze conversation history
-        if conversation_history:
-            for msg in conversation_history:
-                if msg.get("role") != "user":
-                    continue
-                
-                content = msg.get("content", "").lower()
-                
-                if "family" in content:
-                    context.family_support = True
-                if any(word in content for word in ["listen", "support", "understand"]):
-                    context.support_quality = True
-                if any(word in content for word in ["divorce", "separation", "breakup"]):
-                    context.relationship_crisis = True
-        
-        return context
+        return context | _scan_keywords(query.lower(), _QUERY_KEYWORD_FLAGS)
+
+    def _scan_history(self, conversation_history: Optional[List[Dict]]) -> UserContext:
+        """Collect history signals from the user's recent messages"""
+        # Bound the work per turn however long the session gets
+        recent = (conversation_history or [])[-self.CONTEXT_HISTORY_WINDOW:]
+
+        # Lowercase and scan the user messages as one string instead of
+        # once per message
+        user_text = "\n".join(
+            msg.get("content", "")
+            for msg in recent
+            if msg.get("role") == "user"
+        )
+        if not user_text:
+            return UserContext.NONE
+        return _scan_keywords(user_text.lower(), _HISTORY_KEYWORD_FLAGS)
 
     # --------------------------------------------------
     # Phase Detection
@@ -224,67 +579,38 @@ When you DO share a verse:
         """Build context-aware prompt for Gemini with user profile personalization"""
         
         # Format user profile if available
-        profile_text = ""
+        profile_items: Tuple[Tuple[str, str], ...] = ()
         if user_profile:
-            logger.info(f"Building prompt with user_profile: {user_profile}")
-            has_data = False
-            profile_parts = []
-            
-            if user_profile.get('name'):
-                profile_parts.append(f"   • Their name is: {user_profile.get('name')}")
-                has_data = True
-            if user_profile.get('age_group'):
-                profile_parts.append(f"   • Age group: {user_profile.get('age_group')}")
-                has_data = True
-            if user_profile.get('dob'):
-                profile_parts.append(f"   • Date of birth: {user_profile.get('dob')}")
-                has_data = True
-            if user_profile.get('profession'):
-                profile_parts.append(f"   • Profession: {user_profile.get('profession')}")
-                has_data = True
-            if user_profile.get('gender'):
-                profile_parts.append(f"   • Gender: {user_profile.get('gender')}")
-                has_data = True
-            if user_profile.get('phone'):
-                profile_parts.append(f"   • Phone: {user_profile.get('phone')}")
-                has_data = True
-            
-            # Add context for conversation
-            if user_profile.get('primary_concern'):
-                profile_parts.append(f"   • What they've shared: {user_profile.get('primary_concern')}")
-                has_data = True
-            if user_profile.get('emotional_state'):
-                profile_parts.append(f"   • Current emotion: {user_profile.get('emotional_state')}")
-                has_data = True
-            if user_profile.get('life_area'):
-                profile_parts.append(f"   • Life area: {user_profile.get('life_area')}")
-                has_data = True
-            
-            if has_data:
-                profile_text = "\n" + "="*70 + "\n"
-                profile_text += "WHO YOU ARE SPEAKING TO:\n"
-                profile_text += "="*70 + "\n"
-                profile_text += "\n".join(profile_parts)
-                profile_text += "\n" + "="*70 + "\n"
-                profile_text += "\n"
-                logger.info(f"Generated profile section with {len(profile_parts)} fields")
+            # %-style so the dict is only formatted when INFO is enabled
+            logger.info("Building prompt with user_profile: %s", user_profile)
+            profile_items = tuple(
+                (label, str(value))
+                for key, label in PROFILE_FIELDS
+                if (value := user_profile.get(key))
+            )
+            if profile_items:
+                logger.info("Generated profile section with %d fields", len(profile_items))
             else:
                 logger.warning("user_profile provided but no data fields found!")
         else:
             logger.warning("No user_profile provided to prompt builder")
         
-        # Format conversation history (last 12 messages for deep context)
-        history_text = ""
+        # Last 12 messages for deep context: the latest exchanges verbatim,
+        # older ones condensed to their opening sentence
+        recent_history: Tuple[Tuple[str, str], ...] = ()
         if conversation_history:
+            recent = conversation_history[-PROMPT_HISTORY_MESSAGES:]
             # Exclude the very last message if it's the current query to avoid duplication
-            recent_history = conversation_history[-12:]
-            if recent_history and recent_history[-1]["role"] == "user" and recent_history[-1]["content"] == query:
-                recent_history = recent_history[:-1]
-                
-            for msg in recent_history:
-                role = "User" if msg["role"] == "user" else "You"
-                content = msg.get("content", "")
-                history_text += f"{role}: {content}\n"
+            if recent and recent[-1]["role"] == "user" and recent[-1]["content"] == query:
+                recent = recent[:-1]
+            condensed = len(recent) - VERBATIM_HISTORY_MESSAGES
+            recent_history = tuple(
+                (
+                    msg["role"],
+                    _condense(msg.get("content", "")) if i < condensed else msg.get("content", ""),
+                )
+                for i, msg in enumerate(recent)
+            )
         
         # Context summary
         if memory_context:
@@ -292,147 +618,100 @@ When you DO share a verse:
         else:
             context_summary = self._format_context(context)
         
-        # Phase-specific instructions
-        phase_instructions = self._get_phase_instructions(phase)
-        
-        # Format scripture context from RAG if available
-        scripture_context = ""
-        # Allow verses in both phases so the bot can choose the right moment
-        if context_docs and len(context_docs) > 0:
-            scripture_context = "\n═══════════════════════════════════════════════════════════\n"
-            scripture_context += "VERSES AVAILABLE (Use ONLY if they naturally fit the conversation):\n"
-            scripture_context += "═══════════════════════════════════════════════════════════\n\n"
-            
-            for i, doc in enumerate(context_docs[:3], 1):  # Show up to 3 most relevant
-                scripture = doc.get('scripture', 'Scripture')
-                reference = doc.get('reference', '')
-                text = doc.get('text', '')
-                meaning = doc.get('meaning', '')
-                
-                scripture_context += f"VERSE {i}:\n"
-                scripture_context += f"Source: {scripture}"
-                if reference:
-                    scripture_context += f" - {reference}"
-                scripture_context += f"\n\nText: \"{text}\"\n"
-                
-                if meaning:
-                    scripture_context += f"Meaning: {meaning}\n"
-                
-                scripture_context += "\n" + "-" * 60 + "\n\n"
-            
-            scripture_context += """
-HOW TO USE THESE VERSES:
-- **OPTIONAL**: You are NOT required to use these in every response.
-- **USE ONLY IF**: The verse truly offers a solution or comfort to the *specific* thing the user just said.
-- **IF YOU USE IT**:
-  - Cite it clearly (e.g., Bhagavad Gita 2.47).
-  - Explain it simply.
-  - Connect it to their life ("I feel this Says to you that...").
-- Keep it heartfelt and meaningful.
-"""
-
-        
-        # Build final prompt
-        prompt = f"""
-{profile_text}
-
-═══════════════════════════════════════════════════════════
-WHAT YOU KNOW SO FAR (FACTS):
-═══════════════════════════════════════════════════════════
-{context_summary}
-
-═══════════════════════════════════════════════════════════
-CONVERSATION FLOW:
-═══════════════════════════════════════════════════════════
-{history_text}
-
-User's CURRENT message:
-{query}
-
-═══════════════════════════════════════════════════════════
-YOUR INSTRUCTIONS FOR THIS PHASE ({phase.value}):
-═══════════════════════════════════════════════════════════
-{phase_instructions}
-
-{scripture_context}
-
-CRITICAL RULES:
-1. READ THE CONVERSATION FLOW - identify which questions you've already asked.
-2. REVIEW THE FACTS - don't ask for things already listed in "WHAT YOU KNOW SO FAR".
-3. Acknowledge what they just said before asking anything new.
-4. NO-FORMULA RULE: Do not start with "So it sounds like" or "I hear you". Jump straight into a human response.
-5. FRESH WISDOM: Check the "CONVERSATION FLOW". If you already shared a specific verse, NEVER repeat it.
-6. If they didn't ask a question, you don't always need to give a verse. Just stay in the chat.
-7. Keep it conversational, empathetic, and human (around 100-150 words if sharing a verse).
-
-Your response:
-"""
+        # Up to 3 most relevant distinct verses from RAG
+        verses = _select_verses(context_docs or [])
         
-        return prompt.strip()
+        return _render_prompt(
+            query, recent_history, phase, context_summary, verses, profile_items
+        )
 
     def _format_context(self, context: UserContext) -> str:
         """Format context into readable summary"""
         signals = []
-        if context.relationship_crisis:
+        if context & UserContext.RELATIONSHIP_CRISIS:
             signals.append("• User is going through a relationship crisis")
-        if context.family_support:
+        if context & UserContext.FAMILY_SUPPORT:
             signals.append("• User has mentioned family connections")
-        if context.support_quality:
+        if context & UserContext.SUPPORT_QUALITY:
             signals.append("• User is seeking emotional/verbal support")
-        if context.work_stress:
+        if context & UserContext.WORK_STRESS:
             signals.append("• User specifically mentioned work-related challenges")
-        if context.spiritual_seeking:
+        if context & UserContext.SPIRITUAL_SEEKING:
             signals.append("• User is open to or seeking spiritual/philosophical wisdom")
         
         return "\n".join(signals) if signals else "• Still identifying specific life themes"
 
-    def _get_phase_instructions(self, phase: ConversationPhase) -> str:
-        """Get instructions for current conversation phase"""
-        
-        if phase == ConversationPhase.LISTENING:
-            return """
-LISTENING PHASE:
-Your priority is to understand. However, you ARE a spiritual companion.
-
-1. DEEP LISTENING (ESSENTIAL):
-- Acknowledge facts and feelings using your own words (No-Parrot Rule).
-- NEVER ask a question they have already answered.
+    # --------------------------------------------------
+    # Main Response Generation
+    # --------------------------------------------------
 
-2. GENTLE WISDOM (OPTIONAL):
-- Do NOT bring in a verse just to fill space.
-- Only share a verse if it deeply resonates with what they just confessed.
-- If you shared a verse recently, focus this turn on pure human empathy and understanding.
+    def _prepare_prompt(
+        self,
+        query: str,
+        context_docs: Optional[List[Dict]],
+        conversation_history: Optional[List[Dict]],
+        user_profile: Optional[Dict],
+        phase: Optional[ConversationPhase],
+        memory_context: Optional[Any]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Work out context and phase for this turn.
 
-3. STYLE:
-- 80% Empathy, 20% Wisdom.
-- "I hear you..." -> "It must be hard..." -> "It reminds me of..." (Wisdom comes last, if at all).
-"""
+        Returns (prompt, None) when Gemini should be called, or
+        (None, canned_response) when the turn can be answered without it.
+        """
+        # Get history length for logging and logic
+        history_len = len(conversation_history) if conversation_history else 0
+
+        # Closure is decided by the message alone and answered with a canned
+        # reply, so don't scan the history for it
+        if phase is None and is_closure_signal(query):
+            phase = ConversationPhase.CLOSURE
+
+        if phase == ConversationPhase.CLOSURE:
+            name = (user_profile or {}).get("name")
+            logger.info("🌙 Closure turn - using canned response, skipping Gemini")
+            return None, random.choice(CLOSURE_TEMPLATES).format(name=f", {name}" if name else "")
+
+        # Context only feeds phase detection and, without a memory summary,
+        # the prompt; companion and composer turns need neither
+        context = UserContext.NONE
+        if phase is None or not memory_context:
+            context = self._extract_context(query, conversation_history)
         
-        elif phase == ConversationPhase.GUIDANCE:
-            return """
-GUIDANCE PHASE:
-You have understood their situation. Now, be a wise friend leading them toward light.
-
-1. PROACTIVE WISDOM:
-- Share a relevant verse as a central part of your guidance.
-- Weave the wisdom into your response early so the user feels the depth of the tradition.
-
-2. HOW TO SHARE:
-- ALWAYS PROVIDE: Citation (Source/Verse), Simple Explanation, and specific Relevance to their story.
-- Respond to their progress and feelings first, then weave in the wisdom.
-"""
+        # Detect conversation phase if not provided
+        if phase is None:
+            phase = self._detect_phase(query, context, history_len)
         
-        else:  # CLOSURE
-            return """
-- Reassure them they've been heard
-- No pressure, no questions
-- Hold space for silence
-- Offer gentle closing words
-"""
-
-    # --------------------------------------------------
-    # Main Response Generation
-    # --------------------------------------------------
+        logger.info(
+            "Phase: %s | History len: %d | RAG docs: %d",
+            phase.value, history_len, len(context_docs) if context_docs else 0
+        )
+        
+        # Build prompt WITH scripture context from RAG and user profile
+        prompt = self._build_prompt(
+            query, 
+            conversation_history, 
+            phase, 
+            context, 
+            context_docs, 
+            user_profile,
+            memory_context=memory_context
+        )
+        return prompt, None
+
+    def _get_cached_response(self, prompt_key: bytes) -> Optional[str]:
+        """Return the stored response for an identical earlier prompt"""
+        cached_response = self._resp_cache.get(prompt_key)
+        if cached_response is not None:
+            self._resp_cache.move_to_end(prompt_key)
+            logger.info("⚡ Response cache hit - skipping Gemini call")
+        return cached_response
+
+    def _cache_response(self, prompt_key: bytes, response_text: str) -> None:
+        self._resp_cache[prompt_key] = response_text
+        if len(self._resp_cache) > self.RESPONSE_CACHE_SIZE:
+            self._resp_cache.popitem(last=False)
 
     async def generate_response(
         self,
@@ -465,32 +744,22 @@ You have understood their situation. Now, be a wise friend leading them toward l
             return "I'm here with you. Please share what's on your mind."
         
         try:
-            # Extract context from query and history
-            context = self._extract_context(query, conversation_history)
-            
-            # Get history length for logging and logic
-            history_len = len(conversation_history) if conversation_history else 0
-            
-            # Detect conversation phase if not provided
-            if phase is None:
-                phase = self._detect_phase(query, context, history_len)
-            
-            logger.info(f"Phase: {phase.value} | History len: {history_len} | RAG docs: {len(context_docs) if context_docs else 0}")
-            
-            # Build prompt WITH scripture context from RAG and user profile
-            prompt = self._build_prompt(
-                query, 
-                conversation_history, 
-                phase, 
-                context, 
-                context_docs, 
-                user_profile,
-                memory_context=memory_context
+            prompt, canned_response = self._prepare_prompt(
+                query, context_docs, conversation_history,
+                user_profile, phase, memory_context
             )
+            if canned_response is not None:
+                return canned_response
             
-            # Generate response from Gemini
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
+            # Identical prompts (same history, profile and docs) get the same answer
+            prompt_key = _prompt_key(prompt)
+            cached_response = self._get_cached_response(prompt_key)
+            if cached_response is not None:
+                return cached_response
+
+            # Generate response from Gemini without blocking the event loop
+            response = await self.client.aio.models.generate_content(
+                model=GEMINI_MODEL,
                 contents=prompt,
                 config={
                     "system_instruction": self.SYSTEM_INSTRUCTION,
@@ -498,42 +767,96 @@ You have understood their situation. Now, be a wise friend leading them toward l
                 }
             )
 
-            # Fallback responses in case of errors or empty responses
-            fallbacks = [
-                "I'm here with you. You don't have to carry this alone.",
-                "I hear you. Take a deep breath; I'm here to listen.",
-                "I'm with you. Please tell me more about what's on your mind.",
-                "I'm listening. You're not alone in this."
-            ]
-            import random
-            
             if not response:
                 logger.error("No response object from Gemini")
-                return random.choice(fallbacks)
+                return next(_fallback_cycle)
 
             # In SDK v2, check if text is available (might be blocked by safety)
             try:
                 response_text = response.text
                 if not response_text:
                     logger.warning("Empty text response from Gemini (possibly safety blocked)")
-                    return random.choice(fallbacks)
+                    return next(_fallback_cycle)
             except Exception as e:
                 logger.error(f"Could not extract text from Gemini response: {e}")
-                return random.choice(fallbacks)
+                return next(_fallback_cycle)
 
             cleaned_response = clean_response(response_text)
+            self._cache_response(prompt_key, cleaned_response)
             return cleaned_response
             
         except Exception as e:
             logger.exception(f"Error in generate_response: {str(e)}")
-            fallbacks = [
-                "I'm here with you. You don't have to carry this alone.",
-                "I hear you. Take a deep breath; I'm here to listen.",
-                "I'm with you. Please tell me more about what's on your mind.",
-                "I'm listening. You're not alone in this."
-            ]
-            import random
-            return random.choice(fallbacks)
+            return next(_fallback_cycle)
+
+    async def generate_response_stream(
+        self,
+        query: str,
+        context_docs: List[Dict] = None,
+        language: str = "en",
+        conversation_history: Optional[List[Dict]] = None,
+        user_profile: Optional[Dict] = None,
+        phase: Optional[ConversationPhase] = None,
+        memory_context: Optional[Any] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streaming variant of generate_response.
+
+        Yields text chunks as Gemini produces them so the API layer can send
+        the first words before the full answer is ready. Canned, cached and
+        fallback responses arrive as a single chunk.
+        """
+        if not self.available:
+            logger.warning("Gemini not available, returning fallback response")
+            yield "I'm here with you. Please share what's on your mind."
+            return
+
+        parts: List[str] = []
+        try:
+            prompt, canned_response = self._prepare_prompt(
+                query, context_docs, conversation_history,
+                user_profile, phase, memory_context
+            )
+            if canned_response is not None:
+                yield canned_response
+                return
+
+            prompt_key = _prompt_key(prompt)
+            cached_response = self._get_cached_response(prompt_key)
+            if cached_response is not None:
+                yield cached_response
+                return
+
+            stream = await self.client.aio.models.generate_content_stream(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config={
+                    "system_instruction": self.SYSTEM_INSTRUCTION,
+                    "temperature": 0.7,
+                }
+            )
+            async for chunk in stream:
+                text = chunk.text
+                if not parts and text:
+                    text = text.lstrip()
+                if text:
+                    parts.append(text)
+                    yield text
+
+        except Exception as e:
+            logger.exception(f"Error in generate_response_stream: {str(e)}")
+            # Text already sent can't be taken back; only fall back if none was
+            if parts:
+                return
+
+        if not parts:
+            logger.warning("Empty streamed response from Gemini (possibly safety blocked)")
+            yield next(_fallback_cycle)
+            return
+
+        # clean_response only trims, so the streamed chunks need no rewrite;
+        # the cleaned full text is what later identical prompts get back
+        self._cache_response(prompt_key, clean_response("".join(parts)))
 
 
 # --------------------------------------------------
@@ -541,9 +864,12 @@ You have understood their situation. Now, be a wise friend leading them toward l
 # --------------------------------------------------
 
 _llm_service = None
+_llm_service_lock = threading.Lock()
 
 def get_llm_service(api_key: Optional[str] = None) -> LLMService:
     global _llm_service
     if _llm_service is None:
-        _llm_service = LLMService(api_key)
+        with _llm_service_lock:
+            if _llm_service is None:
+                _llm_service = LLMService(api_key)
     return _llm_service
@@ -8,11 +8,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List, Dict
 from enum import Enum
+import asyncio
 import json
 import logging
 
 from config import settings
-from rag.pipeline import RAGPipeline
+from rag.pipeline import RAGPipeline, build_citations
 
 # Import conversation flow services
 from models.session import SessionState, ConversationPhase
@@ -26,7 +27,7 @@ from services.auth_service import get_auth_service, get_conversation_storage
 from rag.pipeline import RAGPipeline
 from rag.vector_store import get_vector_store
 
-from llm.service import get_llm_service
+from llm.service import get_llm_service, fallback_response
 from llm.formatter import get_refiner, get_reformatter
 
 # Setup logging
@@ -61,6 +62,24 @@ app.add_middleware(
 # Initialize components
 rag_pipeline: Optional[RAGPipeline] = None
 
+# Strong references to fire-and-forget tasks so they aren't garbage
+# collected before they finish
+background_tasks: set = set()
+
+# Latest auto-save task per user; each new save waits on it so one user's
+# writes reach MongoDB in order
+auto_save_chains: Dict[str, asyncio.Task] = {}
+
+# Shared SSE payload encoder. Non-ASCII (Hindi/Sanskrit) text goes out as
+# UTF-8 instead of \uXXXX escapes, which roughly halves Devanagari chunks;
+# newlines are still escaped so a chunk never ends the event early.
+_sse_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def sse_event(payload) -> str:
+    """Encode a payload as a single SSE data event"""
+    return f"data: {_sse_encoder.encode(payload)}\n\n"
+
 
 # Pydantic models
 class TextQuery(BaseModel):
@@ -88,6 +107,12 @@ class ConversationPhaseEnum(str, Enum):
     closure = "closure"
 
 
+# Session phase -> API phase, built once instead of a value lookup per response
+API_PHASES = {phase: ConversationPhaseEnum(phase.value) for phase in ConversationPhase}
+
+WELCOME_MESSAGE = "Namaste. I'm here to listen and understand what you're going through. Please share what's on your mind, and I'll do my best to offer guidance from the wisdom of Sanātana Dharma."
+
+
 class SessionCreateResponse(BaseModel):
     """Response when creating a new session"""
     session_id: str
@@ -190,7 +215,8 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> Optio
 
     token = authorization[7:]  # Remove "Bearer " prefix
     auth_service = get_auth_service()
-    return auth_service.verify_token(token)
+    # Token and user lookups are blocking pymongo calls; keep them off the loop
+    return await asyncio.to_thread(auth_service.verify_token, token)
 
 
 @app.on_event("startup")
@@ -201,74 +227,71 @@ async def startup_event():
     logger.info("Starting 3ioNetra Spiritual Companion API...")
 
     # Start heavy initialization in background to allow fast container startup
-    import asyncio
     asyncio.create_task(initialize_components_background())
     logger.info("🚀 Server started! Heavy components initializing in background...")
 
 
+async def warm_up_rag_pipeline(pipeline: RAGPipeline) -> None:
+    """Warm the embedding model; a failure only costs the first query's latency"""
+    try:
+        await pipeline.warm_up()
+    except Exception as e:
+        logger.warning(f"RAG warm-up failed, first query will load the model: {e}")
+
+
 async def initialize_components_background():
     """Background task to initialize heavy components"""
     global rag_pipeline
     
-    # Fix MongoDB index issue (run once to clean up)
-    try:
-        from pymongo import MongoClient
-        mongo_uri = settings.MONGODB_URI
-
-        if settings.DATABASE_PASSWORD:
-            mongo_uri = mongo_uri.replace("<db_password>", settings.DATABASE_PASSWORD)
-        
-        client = MongoClient(mongo_uri)
-        db = client[settings.DATABASE_NAME]
-        
+    # One-off index cleanup normally runs from the deploy pipeline
+    # (scripts/migrate_indexes.py); only do it here when explicitly enabled
+    if settings.RUN_STARTUP_MIGRATIONS:
         try:
-            db.conversations.drop_index("conversation_id_1")
-            logger.info("✅ Dropped old conversation_id_1 index")
-        except:
-            logger.info("conversation_id_1 index doesn't exist (already cleaned)")
-        
-        client.close()
-    except Exception as e:
-        logger.warning(f"Could not drop index: {e}")
+            from scripts.migrate_indexes import drop_legacy_indexes
+            await asyncio.to_thread(drop_legacy_indexes)
+        except Exception as e:
+            logger.warning(f"Could not drop index: {e}")
 
     try:
-        # Initialize RAG Pipeline
-        logger.info("Initializing RAG Pipeline (Background)...")
-        rag_pipeline = RAGPipeline()
-        await rag_pipeline.initialize()
-        logger.info("✅ RAG Pipeline initialized")
-
-        # Initialize LLM Service
+        # Initialize LLM Service first: it creates the shared Gemini client
+        # that the refiner and reformatter reuse
         logger.info("Initializing LLM Service...")
-        llm_service = get_llm_service()
+        llm_service = await asyncio.to_thread(get_llm_service)
         if llm_service.available:
             logger.info("✅ LLM Service initialized successfully with Gemini")
         else:
             logger.warning("LLM Service not available - will use fallback templates. Set GEMINI_API_KEY to enable.")
 
-        # Initialize Query Refiner
-        logger.info("Initializing Query Refiner...")
-        refiner = get_refiner(settings.GEMINI_API_KEY)
+        # The rest are independent, so load them concurrently: scripture
+        # data, the embedding model (warmed with one encode), the Gemini
+        # helpers and the session store (Mongo connect) overlap instead of
+        # adding up
+        logger.info("Initializing RAG Pipeline, Query Refiner, Response Reformatter and Session Manager (Background)...")
+        rag_pipeline = RAGPipeline()
+        _, _, refiner, reformatter, session_manager = await asyncio.gather(
+            rag_pipeline.initialize(),
+            warm_up_rag_pipeline(rag_pipeline),
+            asyncio.to_thread(get_refiner, settings.GEMINI_API_KEY),
+            asyncio.to_thread(get_reformatter, settings.GEMINI_API_KEY),
+            asyncio.to_thread(get_session_manager),
+        )
+        logger.info("✅ RAG Pipeline initialized")
+
         if refiner and refiner.available:
             logger.info("✅ Query Refiner initialized successfully")
         else:
             logger.warning("Query Refiner not available")
 
-        # Initialize Response Reformatter
-        logger.info("Initializing Response Reformatter...")
-        reformatter = get_reformatter(settings.GEMINI_API_KEY)
         if reformatter and reformatter.available:
             logger.info("✅ Response Reformatter initialized successfully")
         else:
             logger.warning("Response Reformatter not available")
 
+        logger.info(f"✅ Session Manager initialized (TTL: {settings.SESSION_TTL_MINUTES} min)")
+
         # Initialize Conversation Flow Services
         logger.info("Initializing Conversation Flow Services...")
 
-        # Session Manager
-        session_manager = get_session_manager()
-        logger.info(f"✅ Session Manager initialized (TTL: {settings.SESSION_TTL_MINUTES} min)")
-
         # Context Synthesizer
         get_context_synthesizer()
         logger.info("✅ Context Synthesizer initialized")
@@ -381,14 +404,8 @@ async def text_query_stream(query: TextQuery):
                     include_citations=query.include_citations,
                     conversation_history=query.conversation_history
                 ):
-                    # For SSE format, we need to escape newlines in the chunk
-                    # because \n\n terminates an SSE event
-                    # Replace actual newlines with escaped newlines for JSON compatibility
-                    import json
-                    # JSON encode the chunk to escape special characters
-                    chunk_escaped = json.dumps(chunk)
-                    # Send as Server-Sent Events format
-                    yield f"data: {chunk_escaped}\n\n"
+                    # Forward each chunk as soon as Gemini produces it
+                    yield sse_event(chunk)
             except Exception as e:
                 logger.error(f"Error in stream generation: {str(e)}")
                 yield f"data: [ERROR] {str(e)}\n\n"
@@ -466,6 +483,99 @@ async def generate_embeddings(text: str):
 # CONVERSATION FLOW ENDPOINTS
 # ============================================================================
 
+def auto_save_conversation(
+    user_id: str,
+    session_id: str,
+    first_user_msg: Optional[str],
+    messages: List[dict],
+    new_conversation: bool
+) -> bool:
+    """Append a session's unsaved messages to the user's stored conversation (blocking)"""
+    try:
+        storage = get_conversation_storage()
+        first_user_msg = first_user_msg or 'Conversation'
+        title = first_user_msg[:50] + '...' if len(first_user_msg) > 50 else first_user_msg
+
+        storage.append_messages(
+            user_id=user_id,
+            title=title,
+            messages=messages,
+            new_conversation=new_conversation
+        )
+        logger.info(f"Auto-saved conversation {session_id} for user {user_id}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to auto-save conversation: {e}")
+        return False
+
+
+async def run_auto_save(
+    session: SessionState,
+    user_id: str,
+    previous: Optional[asyncio.Task]
+) -> None:
+    """Save the session's unsaved messages once the user's previous save is done"""
+    if previous is not None:
+        await asyncio.wait([previous])
+
+    session_manager = get_session_manager()
+    try:
+        # This turn's session may have been loaded before the previous
+        # save recorded its count
+        start = max(
+            session.saved_message_count,
+            await session_manager.get_saved_message_count(session.session_id)
+        )
+    except Exception as e:
+        logger.error(f"Failed to read auto-save position: {e}")
+        return
+
+    # Slicing snapshots the messages against the next turn appending
+    unsaved = session.conversation_history[start:]
+    if not unsaved:
+        return
+    saved = await asyncio.to_thread(
+        auto_save_conversation,
+        user_id,
+        session.session_id,
+        session.first_user_message,
+        unsaved,
+        start == 0
+    )
+    # On failure the count stays put, so the next save retries these messages
+    if not saved:
+        return
+
+    count = start + len(unsaved)
+    session.saved_message_count = max(session.saved_message_count, count)
+    try:
+        await session_manager.mark_messages_saved(session.session_id, count)
+    except Exception as e:
+        logger.error(f"Failed to record auto-save position: {e}")
+
+
+def schedule_auto_save(session: SessionState, user: Optional[dict]) -> None:
+    """Auto-save in the background so the reply isn't held up by MongoDB"""
+    if not user:
+        return
+    if len(session.conversation_history) <= session.saved_message_count:
+        return
+
+    user_id = user["id"]
+    task = asyncio.create_task(
+        run_auto_save(session, user_id, auto_save_chains.get(user_id))
+    )
+    auto_save_chains[user_id] = task
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+    def end_chain(done: asyncio.Task) -> None:
+        if auto_save_chains.get(user_id) is done:
+            del auto_save_chains[user_id]
+
+    task.add_done_callback(end_chain)
+
+
 @app.post("/api/session/create", response_model=SessionCreateResponse)
 async def create_session():
     """
@@ -481,14 +591,12 @@ async def create_session():
             max_turns=settings.MAX_CLARIFICATION_TURNS
         )
 
-        welcome_message = "Namaste. I'm here to listen and understand what you're going through. Please share what's on your mind, and I'll do my best to offer guidance from the wisdom of Sanātana Dharma."
-
         logger.info(f"Created new session: {session.session_id}")
 
         return SessionCreateResponse(
             session_id=session.session_id,
-            phase=ConversationPhaseEnum(session.phase.value),
-            message=welcome_message
+            phase=API_PHASES[session.phase],
+            message=WELCOME_MESSAGE
         )
 
     except Exception as e:
@@ -510,7 +618,7 @@ async def get_session_state(session_id: str):
 
         return SessionStateResponse(
             session_id=session.session_id,
-            phase=ConversationPhaseEnum(session.phase.value),
+            phase=API_PHASES[session.phase],
             turn_count=session.turn_count,
             signals_collected=session.get_signals_summary(),
             created_at=session.created_at.isoformat()
@@ -523,6 +631,115 @@ async def get_session_state(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def load_conversation_session(query: ConversationalQuery, user: Optional[dict]) -> SessionState:
+    """Get or create the session for a conversational turn and refresh its user data"""
+    session_manager = get_session_manager()
+
+    # Get or create session
+    if query.session_id:
+        logger.info(f"🔍 Looking up session {query.session_id} in storage...")
+        session = await session_manager.get_session(query.session_id)
+        if not session:
+            logger.warning(f"❌ Session {query.session_id} not found or expired. Creating a new session to continue.")
+            session = await session_manager.create_session(
+                min_signals=settings.MIN_SIGNALS_THRESHOLD,
+                min_turns=settings.MIN_CLARIFICATION_TURNS,
+                max_turns=settings.MAX_CLARIFICATION_TURNS
+            )
+            logger.info(f"✅ Auto-recovered: Created new session {session.session_id} to replace missing {query.session_id}")
+        else:
+            logger.info(f"✅ Found existing session {query.session_id}, turn_count={session.turn_count}")
+    else:
+        logger.info("🆕 No session_id provided, creating new session...")
+        session = await session_manager.create_session(
+            min_signals=settings.MIN_SIGNALS_THRESHOLD,
+            min_turns=settings.MIN_CLARIFICATION_TURNS,
+            max_turns=settings.MAX_CLARIFICATION_TURNS
+        )
+        logger.info(f"✅ Created new session {session.session_id}")
+
+    # ALWAYS refresh user data in session memory if user is authenticated
+    # This ensures even existing sessions get updated with user profile
+    if user:
+        # Update authenticated user information in memory
+        session.memory.user_id = user.get('id', '')
+        session.memory.user_name = user.get('name', '')
+        session.memory.user_email = user.get('email', '')
+        session.memory.user_phone = user.get('phone', '')
+        session.memory.user_dob = user.get('dob', '')
+        session.memory.user_created_at = user.get('created_at', '')
+        
+        # Update user demographics in story (only if not already set or if user data has changed)
+        story = session.memory.story
+        if user.get('age_group'):
+            story.age_group = user.get('age_group')
+        if user.get('gender'):
+            story.gender = user.get('gender')
+        if user.get('profession'):
+            story.profession = user.get('profession')
+        
+        logger.info(
+            f"Session {session.session_id}: Refreshed user data "
+            f"(id={session.memory.user_id}, name={session.memory.user_name}, age_group={story.age_group})"
+        )
+    
+    # Also populate from user_profile if provided in query
+    if query.user_profile:
+        profile = query.user_profile
+        story = session.memory.story
+        if profile.age_group:
+            story.age_group = profile.age_group
+        if profile.gender:
+            story.gender = profile.gender
+        if profile.profession:
+            story.profession = profile.profession
+        logger.info(
+            f"Session {session.session_id}: Updated with user profile "
+            f"(age_group={profile.age_group}, profession={profile.profession})"
+        )
+
+    return session
+
+
+async def retrieve_guidance_verses(session: SessionState, language: str) -> List[dict]:
+    """Move the session to guidance and retrieve verses for what it has understood"""
+    # Transition to guidance phase
+    session.phase = ConversationPhase.GUIDANCE
+
+    # Use memory-aware synthesis
+    session.dharmic_query = get_context_synthesizer().synthesize_from_memory(session)
+    search_query = session.dharmic_query.build_search_query()
+
+    # Retrieve relevant verses
+    return await rag_pipeline.search(
+        query=search_query,
+        scripture_filter=None,
+        language=language,
+        top_k=5
+    )
+
+
+async def finish_conversation_turn(
+    session: SessionState,
+    user: Optional[dict],
+    response_text: str,
+    is_guidance: bool
+) -> None:
+    """Record the assistant's reply and persist the session"""
+    # Add to history
+    session.add_message('assistant', response_text)
+
+    if is_guidance:
+        # Oscillation Logic: Reset readiness to encourage listening phase next
+        session.memory.readiness_for_wisdom = 0.3  # Drop significantly to force listening turns
+        session.last_guidance_turn = session.turn_count # Mark this turn as guidance
+
+    # Auto-save conversation to MongoDB if user is authenticated
+    schedule_auto_save(session, user)
+
+    await get_session_manager().update_session(session)
+
+
 @app.post("/api/conversation", response_model=ConversationalResponse)
 async def conversational_query(query: ConversationalQuery, user: dict = Depends(get_current_user)):
     """
@@ -544,72 +761,10 @@ async def conversational_query(query: ConversationalQuery, user: dict = Depends(
         # Get services
         session_manager = get_session_manager()
         companion_engine = get_companion_engine()
-        context_synthesizer = get_context_synthesizer()
         safety_validator = get_safety_validator()
         response_composer = get_response_composer()
 
-        # Get or create session
-        if query.session_id:
-            logger.info(f"🔍 Looking up session {query.session_id} in storage...")
-            session = await session_manager.get_session(query.session_id)
-            if not session:
-                logger.warning(f"❌ Session {query.session_id} not found or expired. Creating a new session to continue.")
-                session = await session_manager.create_session(
-                    min_signals=settings.MIN_SIGNALS_THRESHOLD,
-                    min_turns=settings.MIN_CLARIFICATION_TURNS,
-                    max_turns=settings.MAX_CLARIFICATION_TURNS
-                )
-                logger.info(f"✅ Auto-recovered: Created new session {session.session_id} to replace missing {query.session_id}")
-            else:
-                logger.info(f"✅ Found existing session {query.session_id}, turn_count={session.turn_count}")
-        else:
-            logger.info("🆕 No session_id provided, creating new session...")
-            session = await session_manager.create_session(
-                min_signals=settings.MIN_SIGNALS_THRESHOLD,
-                min_turns=settings.MIN_CLARIFICATION_TURNS,
-                max_turns=settings.MAX_CLARIFICATION_TURNS
-            )
-            logger.info(f"✅ Created new session {session.session_id}")
-
-        # ALWAYS refresh user data in session memory if user is authenticated
-        # This ensures even existing sessions get updated with user profile
-        if user:
-            # Update authenticated user information in memory
-            session.memory.user_id = user.get('id', '')
-            session.memory.user_name = user.get('name', '')
-            session.memory.user_email = user.get('email', '')
-            session.memory.user_phone = user.get('phone', '')
-            session.memory.user_dob = user.get('dob', '')
-            session.memory.user_created_at = user.get('created_at', '')
-            
-            # Update user demographics in story (only if not already set or if user data has changed)
-            story = session.memory.story
-            if user.get('age_group'):
-                story.age_group = user.get('age_group')
-            if user.get('gender'):
-                story.gender = user.get('gender')
-            if user.get('profession'):
-                story.profession = user.get('profession')
-            
-            logger.info(
-                f"Session {session.session_id}: Refreshed user data "
-                f"(id={session.memory.user_id}, name={session.memory.user_name}, age_group={story.age_group})"
-            )
-        
-        # Also populate from user_profile if provided in query
-        if query.user_profile:
-            profile = query.user_profile
-            story = session.memory.story
-            if profile.age_group:
-                story.age_group = profile.age_group
-            if profile.gender:
-                story.gender = profile.gender
-            if profile.profession:
-                story.profession = profile.profession
-            logger.info(
-                f"Session {session.session_id}: Updated with user profile "
-                f"(age_group={profile.age_group}, profession={profile.profession})"
-            )
+        session = await load_conversation_session(query, user)
 
         # Safety check first
         is_crisis, crisis_response = await safety_validator.check_crisis_signals(
@@ -622,7 +777,7 @@ async def conversational_query(query: ConversationalQuery, user: dict = Depends(
 
             return ConversationalResponse(
                 session_id=session.session_id,
-                phase=ConversationPhaseEnum(session.phase.value),
+                phase=API_PHASES[session.phase],
                 response=crisis_response,
                 signals_collected=session.get_signals_summary(),
                 turn_count=session.turn_count,
@@ -642,75 +797,25 @@ async def conversational_query(query: ConversationalQuery, user: dict = Depends(
         logger.info(f"Session {session.session_id}: turn={session.turn_count}, memory_readiness={session.memory.readiness_for_wisdom:.2f}, ready={is_ready_for_wisdom}")
 
         if is_ready_for_wisdom:
-            # Transition to guidance phase
-            session.phase = ConversationPhase.GUIDANCE
-            
-            # Use memory-aware synthesis
-            session.dharmic_query = context_synthesizer.synthesize_from_memory(session)
-            dharmic_query = session.dharmic_query
-            search_query = dharmic_query.build_search_query()
-
-            # Retrieve relevant verses
-            retrieved_docs = await rag_pipeline.search(
-                query=search_query,
-                scripture_filter=None,
-                language=query.language,
-                top_k=5
-            )
+            retrieved_docs = await retrieve_guidance_verses(session, query.language)
 
             # Check if we should reduce scripture density
             reduce_scripture = safety_validator.should_reduce_scripture_density(session)
 
             response_text = await response_composer.compose_with_memory(
-                dharmic_query=dharmic_query,
+                dharmic_query=session.dharmic_query,
                 memory=session.memory,
                 retrieved_verses=retrieved_docs,
                 reduce_scripture=reduce_scripture,
                 phase=ConversationPhase.GUIDANCE,
-                original_query=query.message
+                original_query=query.message,
+                conversation_history=session.conversation_history
             )
 
             # Validate response
             response_text = await safety_validator.validate_response(response_text)
 
-            
-            # Add to history
-            session.add_message('assistant', response_text)
-
-            # Oscillation Logic: Reset readiness to encourage listening phase next
-            session.memory.readiness_for_wisdom = 0.3  # Drop significantly to force listening turns
-            session.last_guidance_turn = session.turn_count # Mark this turn as guidance
-
-            await session_manager.update_session(session)
-
-            # Auto-save conversation to MongoDB if user is authenticated
-            if user:
-                try:
-                    storage = get_conversation_storage()
-                    first_user_msg = next((msg['content'] for msg in session.conversation_history if msg['role'] == 'user'), 'Conversation')
-                    title = first_user_msg[:50] + '...' if len(first_user_msg) > 50 else first_user_msg
-                    
-                    storage.save_conversation(
-                        user_id=user["id"],
-                        conversation_id=session.session_id,
-                        title=title,
-                        messages=session.conversation_history
-                    )
-                    logger.info(f"Auto-saved conversation {session.session_id} for user {user['id']}")
-                except Exception as e:
-                    logger.error(f"Failed to auto-save conversation: {e}")
-
-
-            # Build citations
-            citations = [
-                {
-                    'reference': doc.get('reference', ''),
-                    'scripture': doc.get('scripture', ''),
-                    'text': doc.get('text', '')[:200],
-                    'score': doc.get('score', 0)
-                }
-                for doc in retrieved_docs[:2]
-            ]
+            await finish_conversation_turn(session, user, response_text, is_guidance=True)
 
             return ConversationalResponse(
                 session_id=session.session_id,
@@ -719,30 +824,12 @@ async def conversational_query(query: ConversationalQuery, user: dict = Depends(
                 signals_collected=session.get_signals_summary(),
                 turn_count=session.turn_count,
                 is_complete=True,
-                citations=citations
+                citations=build_citations(retrieved_docs)
             )
 
         else:
             # Still in listening phase - return companion's empathetic response
-            session.add_message('assistant', companion_response)
-            await session_manager.update_session(session)
-            
-            # Auto-save conversation to MongoDB if user is authenticated
-            if user:
-                try:
-                    storage = get_conversation_storage()
-                    first_user_msg = next((msg['content'] for msg in session.conversation_history if msg['role'] == 'user'), 'Conversation')
-                    title = first_user_msg[:50] + '...' if len(first_user_msg) > 50 else first_user_msg
-                    
-                    storage.save_conversation(
-                        user_id=user["id"],
-                        conversation_id=session.session_id,
-                        title=title,
-                        messages=session.conversation_history
-                    )
-                    logger.info(f"Auto-saved conversation {session.session_id} for user {user['id']}")
-                except Exception as e:
-                    logger.error(f"Failed to auto-save conversation: {e}")
+            await finish_conversation_turn(session, user, companion_response, is_guidance=False)
 
             return ConversationalResponse(
                 session_id=session.session_id,
@@ -764,32 +851,101 @@ async def conversational_query(query: ConversationalQuery, user: dict = Depends(
 async def conversational_query_stream(query: ConversationalQuery, user: dict = Depends(get_current_user)):
     """
     Streaming version of conversational endpoint.
-    Streams response during ANSWERING phase only.
-    During CLARIFICATION, returns complete question immediately.
+
+    Sends one metadata event (session, phase, citations), then the reply as
+    a series of text events while Gemini generates it, then [DONE].
     """
     try:
         if not rag_pipeline:
             raise HTTPException(status_code=500, detail="RAG pipeline not initialized")
 
-        # For now, use the non-streaming endpoint and wrap in SSE
-        # Full streaming implementation can be added later
-        # Create a modified query object for the conversational endpoint
-        response = await conversational_query(query, user)
+        # Get services
+        session_manager = get_session_manager()
+        companion_engine = get_companion_engine()
+        safety_validator = get_safety_validator()
+        response_composer = get_response_composer()
+
+        session = await load_conversation_session(query, user)
+
+        # Safety check first
+        is_crisis, crisis_response = await safety_validator.check_crisis_signals(
+            session, query.message
+        )
+        citations = None
+        if is_crisis:
+            session.add_message('user', query.message)
+            session.add_message('assistant', crisis_response)
+            await session_manager.update_session(session)
+            is_ready_for_wisdom = False
+            phase = API_PHASES[session.phase]
+        else:
+            # Add user message to history
+            session.add_message('user', query.message)
+            session.turn_count += 1
+
+            is_ready_for_wisdom = companion_engine.begin_turn(session, query.message)
+            logger.info(f"Session {session.session_id}: turn={session.turn_count}, memory_readiness={session.memory.readiness_for_wisdom:.2f}, ready={is_ready_for_wisdom}")
+
+            if is_ready_for_wisdom:
+                phase = ConversationPhaseEnum.guidance
+
+                # Retrieval finishes before the first token, so citations
+                # can go out in the metadata event
+                retrieved_docs = await retrieve_guidance_verses(session, query.language)
+                citations = build_citations(retrieved_docs)
+                reply_stream = safety_validator.validate_response_stream(
+                    response_composer.compose_with_memory_stream(
+                        dharmic_query=session.dharmic_query,
+                        memory=session.memory,
+                        retrieved_verses=retrieved_docs,
+                        reduce_scripture=safety_validator.should_reduce_scripture_density(session),
+                        phase=ConversationPhase.GUIDANCE,
+                        original_query=query.message,
+                        conversation_history=session.conversation_history
+                    )
+                )
+            else:
+                phase = ConversationPhaseEnum.listening
+                reply_stream = companion_engine.listening_reply_stream(session, query.message)
 
         async def generate_stream():
-            # Send the response as a single SSE event with metadata
+            # Send the metadata first
             data = {
-                "session_id": response.session_id,
-                "phase": response.phase.value,
-                "turn_count": response.turn_count,
-                "signals_collected": response.signals_collected,
-                "is_complete": response.is_complete,
-                "citations": response.citations,
+                "session_id": session.session_id,
+                "phase": phase.value,
+                "turn_count": session.turn_count,
+                "signals_collected": session.get_signals_summary(),
+                "is_complete": is_ready_for_wisdom,
+                "citations": citations,
             }
-            yield f"data: {json.dumps(data)}\n\n"
+            yield sse_event(data)
+
+            if is_crisis:
+                yield sse_event(crisis_response)
+            else:
+                # Stream the response text as it is generated
+                parts = []
+                try:
+                    async for chunk in reply_stream:
+                        parts.append(chunk)
+                        yield sse_event(chunk)
+                except Exception as e:
+                    logger.error(f"Error in conversational stream generation: {str(e)}")
+                    yield f"data: [ERROR] {str(e)}\n\n"
+                finally:
+                    # Its own task, so a client disconnect or a failed stream
+                    # still records the turn with whatever text was sent
+                    reply = "".join(parts).strip() or fallback_response()
+                    persist = asyncio.create_task(finish_conversation_turn(
+                        session, user, reply, is_guidance=is_ready_for_wisdom
+                    ))
+                    background_tasks.add(persist)
+                    persist.add_done_callback(background_tasks.discard)
 
-            # Stream the response text
-            yield f"data: {json.dumps(response.response)}\n\n"
+                try:
+                    await asyncio.shield(persist)
+                except Exception as e:
+                    logger.error(f"Error saving streamed conversation turn: {str(e)}")
 
             # End signal
             yield "data: [DONE]\n\n"
@@ -839,7 +995,8 @@ async def register_user(request: UserRegisterRequest):
     try:
         auth_service = get_auth_service()
 
-        result = auth_service.register_user(
+        result = await asyncio.to_thread(
+            auth_service.register_user,
             name=request.name,
             email=request.email,
             password=request.password,
@@ -872,7 +1029,8 @@ async def login_user(request: UserLoginRequest):
     try:
         auth_service = get_auth_service()
 
-        result = auth_service.login_user(
+        result = await asyncio.to_thread(
+            auth_service.login_user,
             email=request.email,
             password=request.password
         )
@@ -911,7 +1069,7 @@ async def logout_user(authorization: Optional[str] = Header(None)):
     if authorization and authorization.startswith("Bearer "):
         token = authorization[7:]
         auth_service = get_auth_service()
-        auth_service.logout_user(token)
+        await asyncio.to_thread(auth_service.logout_user, token)
 
     return {"message": "Logged out successfully"}
 
@@ -930,7 +1088,7 @@ async def get_user_conversations(user: dict = Depends(get_current_user)):
 
     try:
         storage = get_conversation_storage()
-        conversations = storage.get_conversations_list(user["id"])
+        conversations = await asyncio.to_thread(storage.get_conversations_list, user["id"])
 
         return {"conversations": conversations}
 
@@ -952,7 +1110,7 @@ async def get_conversation(
 
     try:
         storage = get_conversation_storage()
-        conversation = storage.get_conversation(user["id"], conversation_id)
+        conversation = await asyncio.to_thread(storage.get_conversation, user["id"], conversation_id)
 
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
@@ -979,7 +1137,8 @@ async def save_conversation(
 
     try:
         storage = get_conversation_storage()
-        conversation_id = storage.save_conversation(
+        conversation_id = await asyncio.to_thread(
+            storage.save_conversation,
             user_id=user["id"],
             conversation_id=request.conversation_id,
             title=request.title,
@@ -1009,7 +1168,7 @@ async def delete_conversation(
 
     try:
         storage = get_conversation_storage()
-        deleted = storage.delete_conversation(user["id"], conversation_id)
+        deleted = await asyncio.to_thread(storage.delete_conversation, user["id"], conversation_id)
 
         if not deleted:
             raise HTTPException(status_code=404, detail="Conversation not found")
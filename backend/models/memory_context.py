@@ -5,7 +5,7 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class UserStory:
     """
     Represents the user's story as understood through conversation.
@@ -59,7 +59,7 @@ class UserStory:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationMemory:
     """
     Rich memory context that captures the full understanding of a conversation.
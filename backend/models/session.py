@@ -74,6 +74,12 @@ class SessionState:
     # Oscillation control
     last_guidance_turn: int = -1  # Turn number when guidance was last given
 
+    # First thing the user said, used as the saved conversation's title
+    first_user_message: Optional[str] = None
+
+    # How many history messages the auto-save has already stored
+    saved_message_count: int = 0
+
     def to_dict(self) -> Dict:
         return {
             "session_id": self.session_id,
@@ -87,6 +93,8 @@ class SessionState:
             "min_clarification_turns": self.min_clarification_turns,
             "max_clarification_turns": self.max_clarification_turns,
             "last_guidance_turn": self.last_guidance_turn,
+            "first_user_message": self.first_user_message,
+            "saved_message_count": self.saved_message_count,
             "memory": self.memory.to_dict() if self.memory else None
         }
 
@@ -101,20 +109,30 @@ class SessionState:
             except ValueError:
                 continue
 
+        history = data.get("conversation_history", [])
         session = cls(
             session_id=data["session_id"],
             phase=ConversationPhase(data["phase"]),
             turn_count=data["turn_count"],
             signals_collected=signals,
-            conversation_history=data.get("conversation_history", []),
+            conversation_history=history,
             created_at=data["created_at"] if isinstance(data["created_at"], datetime) else datetime.fromisoformat(data["created_at"]),
             last_activity=data["last_activity"] if isinstance(data["last_activity"], datetime) else datetime.fromisoformat(data["last_activity"]),
             min_signals_threshold=data.get("min_signals_threshold", 4),
             min_clarification_turns=data.get("min_clarification_turns", 3),
             max_clarification_turns=data.get("max_clarification_turns", 6),
             last_guidance_turn=data.get("last_guidance_turn", -1),
+            first_user_message=data.get("first_user_message"),
+            # Sessions stored before the field existed were saved whole on
+            # every turn, so their history is already in MongoDB
+            saved_message_count=data.get("saved_message_count", len(history)),
             memory=ConversationMemory.from_dict(data.get("memory", {}))
         )
+        if session.first_user_message is None:
+            # Sessions stored before the field existed
+            session.first_user_message = next(
+                (msg["content"] for msg in history if msg["role"] == "user"), None
+            )
         return session
 
     # Memory context for rich understanding
@@ -143,6 +161,8 @@ class SessionState:
 
     def add_message(self, role: str, content: str) -> None:
         """Add a message to conversation history"""
+        if role == "user" and self.first_user_message is None:
+            self.first_user_message = content
         self.conversation_history.append({
             "role": role,
             "content": content,
@@ -1,15 +1,136 @@
+import asyncio
 import json
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import AsyncGenerator, Dict, List, Optional, Tuple
+from typing import AsyncGenerator, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 
 from config import settings
-from llm.service import get_llm_service
+from llm.service import FALLBACK_RESPONSES, get_llm_service
 
 logger = logging.getLogger(__name__)
 
+# Most query texts encoded in one model call; see _EncodeBatcher
+ENCODE_BATCH_SIZE = 32
+
+# Query embeddings kept in memory. Listening-phase and guidance searches are
+# built from session memory, so the same search text recurs across turns.
+EMBEDDING_CACHE_SIZE = 1024
+
+
+class _SemanticAnswerCache:
+    """
+    Answers to standalone questions, looked up by cosine similarity of the
+    query embedding so rephrasings of the same question skip Gemini.
+
+    Vectors live in one preallocated float32 matrix; once full, the oldest
+    entry is overwritten.
+    """
+
+    def __init__(self, maxsize: int = 1024, threshold: float = 0.9) -> None:
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Tuple[str, str, List[Dict]]] = []
+        self._next = 0
+
+    @staticmethod
+    def _normalise(vec: np.ndarray) -> Optional[np.ndarray]:
+        norm = np.linalg.norm(vec)
+        # Zero vectors come from the embedding fallback and match nothing
+        return vec / norm if norm else None
+
+    def get(self, vec: np.ndarray, language: str) -> Optional[Tuple[str, List[Dict]]]:
+        q = self._normalise(vec)
+        if q is None or not self._entries or q.shape[0] != self._vectors.shape[1]:
+            return None
+
+        sims = self._vectors[: len(self._entries)] @ q
+        best = int(np.argmax(sims))
+        entry_language, answer, docs = self._entries[best]
+        if sims[best] < self.threshold or entry_language != language:
+            return None
+        return answer, docs
+
+    def put(self, vec: np.ndarray, language: str, answer: str, docs: List[Dict]) -> None:
+        q = self._normalise(vec)
+        if q is None:
+            return
+        if self._vectors is None:
+            self._vectors = np.zeros((self.maxsize, q.shape[0]), dtype="float32")
+
+        entry = (language, answer, docs)
+        if len(self._entries) < self.maxsize:
+            self._vectors[len(self._entries)] = q
+            self._entries.append(entry)
+        else:
+            self._vectors[self._next] = q
+            self._entries[self._next] = entry
+            self._next = (self._next + 1) % self.maxsize
+
+
+# Citations returned with an answer: the top verses, text trimmed to a preview
+CITATION_COUNT = 2
+CITATION_PREVIEW_CHARS = 200
+
+
+def build_citations(docs: List[Dict]) -> List[Dict]:
+    """Citations for the top retrieved verses, shared by every endpoint"""
+    return [
+        {
+            "reference": doc.get("reference", ""),
+            "scripture": doc.get("scripture", ""),
+            "text": (doc.get("text") or "")[:CITATION_PREVIEW_CHARS],
+            "score": doc.get("score", 0.0),
+        }
+        for doc in docs[:CITATION_COUNT]
+    ]
+
+
+class _EncodeBatcher:
+    """
+    Coalesces concurrent query encodes into one embedding-model call.
+
+    A request arriving while the model is idle is encoded straight away;
+    requests arriving while a batch is encoding queue up and go out
+    together as the next batch. There is no wait window, so a lone search
+    pays nothing extra.
+    """
+
+    def __init__(self, encode_many: Callable[[List[str]], List[np.ndarray]]) -> None:
+        self._encode_many = encode_many
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._drain_task: Optional[asyncio.Task] = None
+
+    async def encode(self, text: str) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if self._drain_task is None:
+            self._drain_task = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        try:
+            while self._pending:
+                batch = self._pending[:ENCODE_BATCH_SIZE]
+                del self._pending[:ENCODE_BATCH_SIZE]
+                try:
+                    vecs = await asyncio.to_thread(self._encode_many, [text for text, _ in batch])
+                except Exception as exc:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+                # Callers that gave up (cancelled requests) are skipped
+                for (_, future), vec in zip(batch, vecs):
+                    if not future.done():
+                        future.set_result(vec)
+        finally:
+            self._drain_task = None
+
 
 class RAGPipeline:
     """
@@ -32,7 +153,11 @@ class RAGPipeline:
         self.dim: int = 0
         self.available: bool = False
         self._embedding_model = None  # lazy‑loaded
+        self._embedding_model_lock = threading.Lock()
+        self._embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._encode_batcher = _EncodeBatcher(self._encode_many)
         self._llm = get_llm_service()
+        self._answer_cache = _SemanticAnswerCache()
 
     # ------------------------------------------------------------------
     # Initialisation
@@ -46,6 +171,10 @@ class RAGPipeline:
         in a "not available" state but the API will still behave
         gracefully (returning safe fallbacks instead of crashing).
         """
+        # Parsing the embeddings JSON is CPU/disk bound; keep it off the loop
+        await asyncio.to_thread(self._load_processed_data)
+
+    def _load_processed_data(self) -> None:
         try:
             base_dir = Path(__file__).parent.parent
             processed_path = base_dir / "data" / "processed" / "all_scriptures_processed.json"
@@ -80,6 +209,12 @@ class RAGPipeline:
                 self.available = False
                 return
 
+            # Normalise once here so each search is a single matrix-vector
+            # product instead of re-normalising every verse per query
+            doc_norms = np.linalg.norm(self.embeddings, axis=1, keepdims=True)
+            doc_norms[doc_norms == 0.0] = 1.0
+            self.embeddings /= doc_norms
+
             self.dim = self.embeddings.shape[1]
             self.available = True
 
@@ -99,6 +234,12 @@ class RAGPipeline:
         if self._embedding_model is not None:
             return
 
+        # Encoding runs in worker threads; load the model only once
+        with self._embedding_model_lock:
+            if self._embedding_model is None:
+                self._load_embedding_model()
+
+    def _load_embedding_model(self) -> None:
         try:
             from sentence_transformers import SentenceTransformer
 
@@ -109,19 +250,53 @@ class RAGPipeline:
             logger.exception(f"RAGPipeline: failed to load embedding model: {exc}")
             self._embedding_model = None
 
-    async def generate_embeddings(self, text: str) -> np.ndarray:
-        """
-        Public utility used by /api/embeddings/generate.
-        """
+    def _encode(self, text: str) -> np.ndarray:
+        return self._encode_many([text])[0]
+
+    def _encode_many(self, texts: List[str]) -> List[np.ndarray]:
         self._ensure_embedding_model()
         if self._embedding_model is None:
             # Fallback: deterministic zero vector with configured dim
             dim = self.dim or 768
             logger.warning("RAGPipeline: embedding model unavailable, returning zeros")
-            return np.zeros((dim,), dtype="float32")
+            return [np.zeros((dim,), dtype="float32") for _ in texts]
 
-        vec = self._embedding_model.encode([text], convert_to_tensor=False)[0]
-        return np.asarray(vec, dtype="float32")
+        vecs = self._embedding_model.encode(texts, convert_to_tensor=False)
+        return list(np.asarray(vecs, dtype="float32"))
+
+    async def warm_up(self) -> None:
+        """
+        Load the embedding model and run one throwaway encode at startup,
+        so the first user search doesn't pay the model load and the
+        encoder's first-call setup.
+        """
+        await asyncio.to_thread(self._encode, "warm up")
+
+    async def generate_embeddings(self, text: str) -> np.ndarray:
+        """
+        Public utility used by /api/embeddings/generate.
+
+        Model loading and encoding are CPU-bound, so they run in a worker
+        thread to keep the event loop free for other sessions, batched with
+        any concurrent searches. Results are cached per text and returned
+        read-only, since callers share them.
+        """
+        # The tokenizer ignores runs of whitespace, so collapsing them keeps
+        # the embedding identical while letting more queries share a cache
+        # entry. Case is left alone; the encoder is case-sensitive.
+        text = " ".join(text.split())
+        vec = self._embedding_cache.get(text)
+        if vec is not None:
+            self._embedding_cache.move_to_end(text)
+            return vec
+
+        vec = await self._encode_batcher.encode(text)
+        if self._embedding_model is not None:
+            vec.flags.writeable = False
+            self._embedding_cache[text] = vec
+            if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        return vec
 
     # ------------------------------------------------------------------
     # Core search
@@ -131,17 +306,12 @@ class RAGPipeline:
         if self.embeddings is None or not self.available:
             return np.zeros((0,), dtype="float32")
 
-        # Normalise
+        # Normalise (verse embeddings are normalised at load)
         q = query_vec.astype("float32")
         q_norm = np.linalg.norm(q) or 1.0
         q = q / q_norm
 
-        docs = self.embeddings
-        doc_norms = np.linalg.norm(docs, axis=1, keepdims=True)
-        doc_norms[doc_norms == 0.0] = 1.0
-        normed_docs = docs / doc_norms
-
-        return normed_docs @ q
+        return self.embeddings @ q
 
     async def search(
         self,
@@ -155,18 +325,28 @@ class RAGPipeline:
         - /api/scripture/search
         - conversational flow when building wisdom responses
         """
+        _, results = await self._retrieve(query, scripture_filter, top_k)
+        return results
+
+    async def _retrieve(
+        self,
+        query: str,
+        scripture_filter: Optional[str] = None,
+        top_k: int = 5,
+    ) -> Tuple[Optional[np.ndarray], List[Dict]]:
+        """Search, also returning the query embedding for reuse"""
         if not self.available or not self.verses:
             logger.warning("RAGPipeline.search called but pipeline is not available")
-            return []
+            return None, []
 
         if not query.strip():
             logger.warning("RAGPipeline.search received empty query")
-            return []
+            return None, []
 
         query_vec = await self.generate_embeddings(query)
         sims = self._cosine_similarities(query_vec)
         if sims.size == 0:
-            return []
+            return query_vec, []
 
         # Rank indices by similarity
         top_k = min(top_k, sims.shape[0])
@@ -185,7 +365,7 @@ class RAGPipeline:
             )
 
         logger.info(f"RAGPipeline.search: retrieved {len(results)} verses for query='{query[:60]}'")
-        return results
+        return query_vec, results
 
     # ------------------------------------------------------------------
     # High‑level text QA (used by /api/text/query)
@@ -202,42 +382,48 @@ class RAGPipeline:
         RAG‑augmented QA for standalone text queries.
         """
         # Retrieve context first
-        docs = await self.search(query=query, scripture_filter=None, language=language, top_k=5)
+        query_vec, docs = await self._retrieve(query, top_k=5)
 
+        cacheable = self._is_cacheable(query_vec, conversation_history)
+        cached = self._answer_cache.get(query_vec, language) if cacheable else None
+        if cached:
+            logger.info("⚡ Semantic answer cache hit - skipping Gemini call")
+            answer, docs = cached
         # If LLM is available, let it synthesize an answer
-        if self._llm.available:
+        elif self._llm.available:
             answer = await self._llm.generate_response(
                 query=query,
                 context_docs=docs,
                 language=language,
                 conversation_history=conversation_history or [],
             )
+            if cacheable and answer not in FALLBACK_RESPONSES:
+                self._answer_cache.put(query_vec, language, answer, docs)
         else:
-            # Very simple fallback that just echoes top verse text
-            if docs:
-                top = docs[0]
-                answer = top.get("text") or top.get("meaning") or "I found a relevant verse for you."
-            else:
-                answer = "I couldn't find a specific verse, but I'm here to listen to what you're going through."
-
-        citations: List[Dict] = []
-        if include_citations:
-            for doc in docs[:2]:
-                citations.append(
-                    {
-                        "reference": doc.get("reference", ""),
-                        "scripture": doc.get("scripture", ""),
-                        "text": (doc.get("text") or "")[:200],
-                        "score": doc.get("score", 0.0),
-                    }
-                )
+            answer = self._fallback_answer(docs)
 
         return {
             "answer": answer,
-            "citations": citations,
+            "citations": build_citations(docs) if include_citations else [],
             "confidence": 1.0 if docs else 0.3,
         }
 
+    def _is_cacheable(
+        self,
+        query_vec: Optional[np.ndarray],
+        conversation_history: Optional[List[Dict]],
+    ) -> bool:
+        """Only standalone questions have answers worth sharing between users"""
+        return self._llm.available and query_vec is not None and not conversation_history
+
+    @staticmethod
+    def _fallback_answer(docs: List[Dict]) -> str:
+        """Very simple fallback that just echoes top verse text"""
+        if docs:
+            top = docs[0]
+            return top.get("text") or top.get("meaning") or "I found a relevant verse for you."
+        return "I couldn't find a specific verse, but I'm here to listen to what you're going through."
+
     async def query_stream(
         self,
         query: str,
@@ -246,27 +432,44 @@ class RAGPipeline:
         conversation_history: Optional[List[Dict]] = None,
     ) -> AsyncGenerator[Dict, None]:
         """
-        Simple streaming wrapper over `query`.
+        Streaming counterpart of `query`.
 
-        For now we emit the full answer in a single chunk so that the
-        existing SSE plumbing in `main.py` works without change.
+        Citations are sent as soon as retrieval finishes, then the answer
+        follows as a series of "answer" chunks while Gemini generates it.
         """
-        result = await self.query(
-            query=query,
-            language=language,
-            include_citations=include_citations,
-            conversation_history=conversation_history,
-        )
+        query_vec, docs = await self._retrieve(query, top_k=5)
+
+        cacheable = self._is_cacheable(query_vec, conversation_history)
+        cached = self._answer_cache.get(query_vec, language) if cacheable else None
+        if cached:
+            logger.info("⚡ Semantic answer cache hit - skipping Gemini call")
+            answer, docs = cached
 
         # First send metadata
         yield {
             "type": "meta",
-            "citations": result.get("citations", []),
-            "confidence": result.get("confidence", 0.0),
+            "citations": build_citations(docs) if include_citations else [],
+            "confidence": 1.0 if docs else 0.3,
         }
 
-        # Then the full text as one chunk
-        yield {
-            "type": "answer",
-            "text": result.get("answer", ""),
-        }
+        if cached:
+            yield {"type": "answer", "text": answer}
+            return
+
+        if not self._llm.available:
+            yield {"type": "answer", "text": self._fallback_answer(docs)}
+            return
+
+        parts: List[str] = []
+        async for text in self._llm.generate_response_stream(
+            query=query,
+            context_docs=docs,
+            language=language,
+            conversation_history=conversation_history or [],
+        ):
+            parts.append(text)
+            yield {"type": "answer", "text": text}
+
+        answer = "".join(parts).strip()
+        if cacheable and answer and answer not in FALLBACK_RESPONSES:
+            self._answer_cache.put(query_vec, language, answer, docs)
@@ -281,7 +281,8 @@ class UniversalScriptureIngester:
         for i, verse in enumerate(verses):
             verse['embedding'] = embeddings[i].tolist()
 
-        # Save as JSON
+        # Save as compact JSON - with indent=2 every embedding float lands on its
+        # own line, bloating the file the RAG pipeline parses at startup
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump({
                 'verses': verses,
@@ -291,7 +292,7 @@ class UniversalScriptureIngester:
                     'embedding_model': settings.EMBEDDING_MODEL,
                     'scriptures': sorted(list(set(v.get('scripture', 'Unknown') for v in verses)))
                 }
-            }, f, ensure_ascii=False, indent=2)
+            }, f, ensure_ascii=False, separators=(',', ':'))
 
         logger.info(f"✓ Saved processed data to {output_file}")
 
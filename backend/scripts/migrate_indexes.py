@@ -0,0 +1,55 @@
+"""
+One-off MongoDB index migrations
+Run from the deploy pipeline instead of on every server start:
+    python scripts/migrate_indexes.py
+"""
+import sys
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import settings
+
+
+# Indexes from earlier schemas that conflict with the current one
+LEGACY_CONVERSATION_INDEXES = ["conversation_id_1"]
+
+
+def drop_legacy_indexes() -> None:
+    """Drop legacy indexes from the conversations collection if present"""
+    from pymongo import MongoClient
+    from pymongo.errors import OperationFailure
+
+    if not settings.MONGODB_URI or not settings.DATABASE_NAME:
+        logger.info("MongoDB not configured, skipping index migration")
+        return
+
+    mongo_uri = settings.MONGODB_URI
+    if settings.DATABASE_PASSWORD:
+        mongo_uri = mongo_uri.replace("<db_password>", settings.DATABASE_PASSWORD)
+
+    client = MongoClient(mongo_uri)
+    try:
+        db = client[settings.DATABASE_NAME]
+        for index_name in LEGACY_CONVERSATION_INDEXES:
+            try:
+                db.conversations.drop_index(index_name)
+                logger.info(f"✅ Dropped old {index_name} index")
+            except OperationFailure:
+                logger.info(f"{index_name} index doesn't exist (already cleaned)")
+    finally:
+        client.close()
+
+
+def main():
+    """Run index migrations"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    drop_legacy_indexes()
+
+
+if __name__ == "__main__":
+    main()
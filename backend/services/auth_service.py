@@ -324,6 +324,42 @@ class ConversationStorage:
         logger.info(f"Saved conversation for user {user_id}, total messages: {total_messages}")
         return str(conversation_id)
 
+    def append_messages(
+        self,
+        user_id: str,
+        title: str,
+        messages: list,
+        new_conversation: bool
+    ) -> None:
+        """
+        Push only the given messages onto the user's conversation document,
+        so each auto-save costs the new turn rather than the whole history.
+        """
+        to_push = list(messages)
+
+        # Add separator if not first conversation
+        if new_conversation and self.db.conversations.find_one(
+            {"user_id": user_id, "message_count": {"$gt": 0}}, {"_id": 1}
+        ):
+            to_push.insert(0, {
+                "role": "system",
+                "content": f"--- New Conversation: {title} ---",
+                "timestamp": datetime.utcnow().isoformat()
+            })
+
+        now = datetime.utcnow()
+        self.db.conversations.update_one(
+            {"user_id": user_id},
+            {
+                "$push": {"messages": {"$each": to_push}},
+                "$inc": {"message_count": len(to_push)},
+                "$set": {"updated_at": now, "last_title": title},
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        )
+        logger.info(f"Appended {len(to_push)} messages to conversation for user {user_id}")
+
     def get_conversations_list(self, user_id: str, limit: int = 20) -> list:
         """Get user's conversation (returns single document)"""
         conversation = self.db.conversations.find_one({"user_id": user_id})
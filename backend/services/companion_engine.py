@@ -1,6 +1,6 @@
 import logging
 import random
-from typing import Tuple, Optional, TYPE_CHECKING, Dict
+from typing import AsyncIterator, Tuple, Optional, TYPE_CHECKING, Dict
 
 from models.session import SessionState, ConversationPhase
 from models.memory_context import ConversationMemory
@@ -11,6 +11,16 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Short acknowledgements sent when the user is ready for wisdom
+READY_ACKNOWLEDGEMENTS = (
+    "Thank you for sharing this so openly. Let me reflect and bring you wisdom from the scriptures.",
+    "I appreciate your honesty. I will now look into the ancient teachings for guidance.",
+    "Your words help me understand deeply. Let me draw from Dharma to respond thoughtfully.",
+)
+
+# Listening reply when Gemini is unavailable
+LISTENING_FALLBACK = "I’m here with you. Could you tell me a little more about what feels most heavy right now?"
+
 
 class CompanionEngine:
     """
@@ -45,60 +55,78 @@ class CompanionEngine:
         Returns:
             (assistant_text, is_ready_for_wisdom)
         """
-        self._update_memory(session.memory, session, message)
-
-        is_ready = self._assess_readiness(session)
+        is_ready = self.begin_turn(session, message)
 
         # ------------------------------------------------------------------
         # Ready for wisdom → return short acknowledgement only
         # ------------------------------------------------------------------
         if is_ready:
-            acknowledgements = [
-                "Thank you for sharing this so openly. Let me reflect and bring you wisdom from the scriptures.",
-                "I appreciate your honesty. I will now look into the ancient teachings for guidance.",
-                "Your words help me understand deeply. Let me draw from Dharma to respond thoughtfully.",
-            ]
-            return random.choice(acknowledgements), True
+            return random.choice(READY_ACKNOWLEDGEMENTS), True
 
         # ------------------------------------------------------------------
         # Listening / clarification phase
         # ------------------------------------------------------------------
         if self.llm.available:
-            context_docs = []
-
-            if self.rag_pipeline and self.rag_pipeline.available:
-                try:
-                    search_query = self._build_listening_query(message, session.memory)
-                    context_docs = await self.rag_pipeline.search(
-                        query=search_query,
-                        scripture_filter=None,
-                        language="en",
-                        top_k=3,
-                    )
-                except Exception as e:
-                    logger.warning(f"Listening-phase RAG failed: {e}")
-
             reply = await self.llm.generate_response(
-                query=message,
-                context_docs=context_docs,
-                conversation_history=session.conversation_history,
-                user_profile=self._build_user_profile(session.memory),
-                phase=ConversationPhase.CLARIFICATION,
-                memory_context=session.memory,
+                **await self._listening_request(session, message)
             )
-
             return reply, False
 
         # Fallback (no LLM)
-        return (
-            "I’m here with you. Could you tell me a little more about what feels most heavy right now?",
-            False,
-        )
+        return LISTENING_FALLBACK, False
+
+    def begin_turn(self, session: SessionState, message: str) -> bool:
+        """
+        Take in the user's message and decide if we're ready for wisdom.
+        Streaming callers use this, then listening_reply_stream if not.
+        """
+        self._update_memory(session.memory, session, message)
+        return self._assess_readiness(session)
+
+    async def listening_reply_stream(
+        self,
+        session: SessionState,
+        message: str,
+    ) -> AsyncIterator[str]:
+        """Listening-phase reply, streamed as Gemini produces it"""
+        if not self.llm.available:
+            yield LISTENING_FALLBACK
+            return
+
+        async for chunk in self.llm.generate_response_stream(
+            **await self._listening_request(session, message)
+        ):
+            yield chunk
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    async def _listening_request(self, session: SessionState, message: str) -> Dict:
+        """LLM arguments for a listening-phase reply, grounded in a few verses"""
+        context_docs = []
+
+        if self.rag_pipeline and self.rag_pipeline.available:
+            try:
+                search_query = self._build_listening_query(message, session.memory)
+                context_docs = await self.rag_pipeline.search(
+                    query=search_query,
+                    scripture_filter=None,
+                    language="en",
+                    top_k=3,
+                )
+            except Exception as e:
+                logger.warning(f"Listening-phase RAG failed: {e}")
+
+        return dict(
+            query=message,
+            context_docs=context_docs,
+            conversation_history=session.conversation_history,
+            user_profile=self._build_user_profile(session.memory),
+            phase=ConversationPhase.CLARIFICATION,
+            memory_context=session.memory,
+        )
+
     def _assess_readiness(self, session: SessionState) -> bool:
         """
         Decide if we should transition to ANSWERING phase.
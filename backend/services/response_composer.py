@@ -1,7 +1,7 @@
 """
 Response Composer - Single authority for response generation
 """
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
 import logging
 
 from models.dharmic_query import DharmicQueryObject
@@ -26,7 +26,8 @@ class ResponseComposer:
         retrieved_verses: List[Dict],
         reduce_scripture: bool = False,
         phase: Optional[ConversationPhase] = None,
-        original_query: Optional[str] = None
+        original_query: Optional[str] = None,
+        conversation_history: Optional[List[Dict]] = None
     ) -> str:
         """
         Compose a response using:
@@ -35,8 +36,51 @@ class ResponseComposer:
         - verses retrieved via RAG
         - current conversation phase
         - original user query (for natural response)
+        - the session's conversation history
         """
 
+        request = self._llm_request(
+            dharmic_query, memory, retrieved_verses, reduce_scripture, phase,
+            original_query, conversation_history
+        )
+        if request is None:
+            return self._compose_fallback(dharmic_query)
+
+        return await self.llm.generate_response(**request)
+
+    async def compose_with_memory_stream(
+        self,
+        dharmic_query: DharmicQueryObject,
+        memory: ConversationMemory,
+        retrieved_verses: List[Dict],
+        reduce_scripture: bool = False,
+        phase: Optional[ConversationPhase] = None,
+        original_query: Optional[str] = None,
+        conversation_history: Optional[List[Dict]] = None
+    ) -> AsyncIterator[str]:
+        """Streaming variant of compose_with_memory, yielding text chunks"""
+        request = self._llm_request(
+            dharmic_query, memory, retrieved_verses, reduce_scripture, phase,
+            original_query, conversation_history
+        )
+        if request is None:
+            yield self._compose_fallback(dharmic_query)
+            return
+
+        async for chunk in self.llm.generate_response_stream(**request):
+            yield chunk
+
+    def _llm_request(
+        self,
+        dharmic_query: DharmicQueryObject,
+        memory: ConversationMemory,
+        retrieved_verses: List[Dict],
+        reduce_scripture: bool,
+        phase: Optional[ConversationPhase],
+        original_query: Optional[str],
+        conversation_history: Optional[List[Dict]]
+    ) -> Optional[Dict]:
+        """LLM arguments for a composed response, or None to use the fallback"""
         # Use original query for the LLM prompt if available, 
         # otherwise fallback to build_search_query
         llm_query = original_query
@@ -49,7 +93,7 @@ class ResponseComposer:
 
         if not llm_query:
             logger.error("No query text available for ResponseComposer")
-            return self._compose_fallback(dharmic_query)
+            return None
 
         # Optionally thin out the scripture context when a user is very
         # distressed – we still keep a couple of strong anchors.
@@ -61,17 +105,19 @@ class ResponseComposer:
         user_profile = self._build_user_profile(memory)
 
         if self.llm.available:
-            return await self.llm.generate_response(
+            return dict(
                 query=llm_query,
                 context_docs=context_docs,
-                conversation_history=memory.conversation_history,
+                # The session's history; memory.conversation_history is
+                # never filled in
+                conversation_history=conversation_history or [],
                 user_profile=user_profile,
                 phase=phase,
                 memory_context=memory
             )
 
         logger.info("LLM unavailable, using fallback")
-        return self._compose_fallback(dharmic_query)
+        return None
 
     def _build_user_profile(self, memory: ConversationMemory) -> Dict:
         """
@@ -1,7 +1,7 @@
 """
 Safety Validator - Crisis detection and response validation
 """
-from typing import Tuple, Optional
+from typing import AsyncIterator, Tuple, Optional
 import logging
 import re
 
@@ -33,6 +33,16 @@ BANNED_RESPONSE_PATTERNS = [
     r'you brought this upon yourself',
 ]
 
+# All banned patterns in one pass; most responses match none of them
+_BANNED_RESPONSE_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in BANNED_RESPONSE_PATTERNS),
+    re.IGNORECASE,
+)
+
+# Streamed responses are validated a sentence at a time; no banned pattern
+# spans a sentence end, so each one is seen whole before it is sent
+_SENTENCE_END_RE = re.compile(r"[.!?\n]\s*")
+
 # Mental health resources (India-focused)
 MENTAL_HEALTH_RESOURCES = """
 Please know that speaking with a mental health professional can be incredibly helpful.
@@ -129,6 +139,10 @@ class SafetyValidator:
         Returns:
             Validated/modified response
         """
+        # Fast path: one combined scan clears the usual benign response
+        if not _BANNED_RESPONSE_RE.search(response):
+            return response
+
         response_lower = response.lower()
         modified = response
 
@@ -140,6 +154,26 @@ class SafetyValidator:
 
         return modified
 
+    async def validate_response_stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Streaming variant of validate_response.
+
+        Text is held back until a sentence ends, then validated and sent,
+        so the user still sees the reply appear progressively.
+        """
+        pending = ""
+        async for chunk in chunks:
+            pending += chunk
+            cut = 0
+            for match in _SENTENCE_END_RE.finditer(pending):
+                cut = match.end()
+            if cut:
+                yield await self.validate_response(pending[:cut])
+                pending = pending[cut:]
+
+        if pending:
+            yield await self.validate_response(pending)
+
     def _soften_response(self, response: str, pattern: str) -> str:
         """Replace harmful patterns with supportive alternatives"""
         replacements = {
@@ -1,6 +1,8 @@
 from typing import Optional, Dict
 from datetime import datetime, timedelta
+import asyncio
 import logging
+import threading
 
 from models.session import SessionState, ConversationPhase
 from config import settings
@@ -25,6 +27,12 @@ class SessionManager:
     async def delete_session(self, session_id: str) -> None:
         raise NotImplementedError
 
+    async def get_saved_message_count(self, session_id: str) -> int:
+        raise NotImplementedError
+
+    async def mark_messages_saved(self, session_id: str, count: int) -> None:
+        raise NotImplementedError
+
     async def transition_phase(
         self,
         session: SessionState,
@@ -73,6 +81,15 @@ class InMemorySessionManager(SessionManager):
     async def delete_session(self, session_id: str) -> None:
         self._sessions.pop(session_id, None)
 
+    async def get_saved_message_count(self, session_id: str) -> int:
+        session = self._sessions.get(session_id)
+        return session.saved_message_count if session else 0
+
+    async def mark_messages_saved(self, session_id: str, count: int) -> None:
+        session = self._sessions.get(session_id)
+        if session:
+            session.saved_message_count = max(session.saved_message_count, count)
+
 
 # ============================================================================
 # MongoDB Session Manager (Production)
@@ -111,31 +128,60 @@ class MongoSessionManager(SessionManager):
         logger.info(f"🆕 Created session {session.session_id}")
         return session
 
+    # pymongo is blocking, so every call runs in a worker thread to keep
+    # other sessions' requests moving during the round trip
+
     async def get_session(self, session_id: str) -> Optional[SessionState]:
-        doc = self.collection.find_one({"session_id": session_id})
+        doc = await asyncio.to_thread(self.collection.find_one, {"session_id": session_id})
         if not doc:
             return None
 
         session = SessionState.from_dict(doc)
 
-        # 🔥 CRITICAL: refresh activity on read
+        # 🔥 CRITICAL: refresh activity on read. Only the timestamp changed,
+        # so don't rewrite the whole document; the turn saves it afterwards.
         session.last_activity = datetime.utcnow()
-        await self.update_session(session)
+        await asyncio.to_thread(
+            self.collection.update_one,
+            {"session_id": session_id},
+            {"$set": {"last_activity": session.last_activity.isoformat()}}
+        )
 
         return session
 
     async def update_session(self, session: SessionState) -> None:
         session.last_activity = datetime.utcnow()
+        # Serialize here, not in the thread, so a concurrent change can't
+        # tear the snapshot
         data = session.to_dict()
+        # A turn loaded before the last auto-save finished carries an older
+        # count; never let it move the stored one back
+        saved_message_count = data.pop("saved_message_count")
 
-        self.collection.update_one(
+        await asyncio.to_thread(
+            self.collection.update_one,
             {"session_id": session.session_id},
-            {"$set": data},
+            {"$set": data, "$max": {"saved_message_count": saved_message_count}},
             upsert=True
         )
 
     async def delete_session(self, session_id: str) -> None:
-        self.collection.delete_one({"session_id": session_id})
+        await asyncio.to_thread(self.collection.delete_one, {"session_id": session_id})
+
+    async def get_saved_message_count(self, session_id: str) -> int:
+        doc = await asyncio.to_thread(
+            self.collection.find_one,
+            {"session_id": session_id},
+            {"saved_message_count": 1}
+        )
+        return doc.get("saved_message_count", 0) if doc else 0
+
+    async def mark_messages_saved(self, session_id: str, count: int) -> None:
+        await asyncio.to_thread(
+            self.collection.update_one,
+            {"session_id": session_id},
+            {"$max": {"saved_message_count": count}}
+        )
 
 
 # ============================================================================
@@ -143,6 +189,7 @@ class MongoSessionManager(SessionManager):
 # ============================================================================
 
 _session_manager: Optional[SessionManager] = None
+_session_manager_lock = threading.Lock()
 
 
 def get_session_manager() -> SessionManager:
@@ -153,17 +200,21 @@ def get_session_manager() -> SessionManager:
     global _session_manager
 
     if _session_manager is None:
-        ttl = settings.SESSION_TTL_MINUTES
-
-        if settings.MONGODB_URI and settings.DATABASE_NAME:
-            try:
-                _session_manager = MongoSessionManager(ttl)
-                logger.info("✅ Using MongoDB session storage")
-            except Exception as e:
-                logger.error(f"Mongo init failed, falling back to memory: {e}")
-                _session_manager = InMemorySessionManager(ttl)
-        else:
-            logger.info("ℹ️ Using in-memory session storage")
-            _session_manager = InMemorySessionManager(ttl)
+        # Startup builds it in a worker thread while requests may already
+        # ask for it on the loop; a second instance would lose sessions
+        with _session_manager_lock:
+            if _session_manager is None:
+                ttl = settings.SESSION_TTL_MINUTES
+
+                if settings.MONGODB_URI and settings.DATABASE_NAME:
+                    try:
+                        _session_manager = MongoSessionManager(ttl)
+                        logger.info("✅ Using MongoDB session storage")
+                    except Exception as e:
+                        logger.error(f"Mongo init failed, falling back to memory: {e}")
+                        _session_manager = InMemorySessionManager(ttl)
+                else:
+                    logger.info("ℹ️ Using in-memory session storage")
+                    _session_manager = InMemorySessionManager(ttl)
 
     return _session_manager
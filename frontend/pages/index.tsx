@@ -255,6 +255,7 @@ export default function Home() {
 
         if (reader) {
           let accumulatedContent = '';
+          let streamCitations: Citation[] = [];
           let buffer = '';
 
           while (true) {
@@ -273,7 +274,14 @@ export default function Home() {
                 if (content && content !== '[DONE]' && !content.startsWith('[ERROR]')) {
                   try {
                     const decoded = JSON.parse(content);
-                    accumulatedContent += decoded;
+                    // Chunks are {type: 'meta', citations} then {type: 'answer', text}
+                    if (typeof decoded === 'string') {
+                      accumulatedContent += decoded;
+                    } else if (decoded?.type === 'answer') {
+                      accumulatedContent += decoded.text || '';
+                    } else if (decoded?.type === 'meta') {
+                      streamCitations = decoded.citations || [];
+                    }
                   } catch {
                     accumulatedContent += content;
                   }
@@ -283,6 +291,7 @@ export default function Home() {
                     const lastMessage = newMessages[newMessages.length - 1];
                     if (lastMessage && lastMessage.role === 'assistant') {
                       lastMessage.content = accumulatedContent;
+                      lastMessage.citations = streamCitations;
                     }
                     return newMessages;
                   });